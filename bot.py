@@ -7,19 +7,42 @@ Supports multiple users with individual sessions and configurations
 """
 
 import os
-import json
 import sqlite3
 import asyncio
+import contextlib
+import concurrent.futures
+import functools
 import logging
-import requests
-from datetime import datetime, timedelta
-from typing import Dict, List, Set, Optional
+import queue
+import random
+import sys
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+import httpx
+from cachetools import TTLCache
+from datetime import datetime, timezone
+from urllib.parse import quote
+from typing import Dict, List, Set, Optional, Tuple, Union
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
+from telegram.error import RetryAfter
+from telegram.helpers import escape_markdown
 from telegram.ext import (
     Application, CommandHandler, CallbackQueryHandler, 
     MessageHandler, filters, ContextTypes
 )
 
+try:
+    from orjson import loads as json_loads
+except ImportError:  # the stdlib decoder also accepts bytes, just more slowly
+    from json import loads as json_loads
+
+try:
+    from cryptography.fernet import Fernet, InvalidToken
+except ImportError:  # Steam tokens are stored in plain text without it
+    Fernet = None
+
 # Configure logging
 logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
@@ -27,27 +50,608 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Outbound Telegram delivery
+TG_SEND_WORKERS = 4
+TG_MESSAGES_PER_SECOND = 30
+TG_BATCH_WINDOW = 1.0
+TG_MAX_MESSAGE_LENGTH = 4096
+TG_CHAT_MIN_INTERVAL = 1.0  # Telegram allows roughly one message per second to the same chat
+TG_SEND_RETRIES = 3  # flood-control retries per message before it is dropped
+
+# SCMM API - request timeout, in-flight request limit, retry policy
+SCMM_TIMEOUT = 15
+SCMM_MAX_CONCURRENCY = 8
+SCMM_MAX_RETRIES = 3
+SCMM_RETRY_BASE_DELAY = 1.0
+SCMM_RETRY_STATUSES = (429, 503)
+SCMM_HEADERS = {'Accept': 'application/json', 'User-Agent': 'rust-skin-bot/1.0'}
+
+# Shared HTTP connection pool - idle sockets outlive the poll interval so TLS sessions are reused
+HTTP_MAX_CONNECTIONS = 200
+HTTP_MAX_KEEPALIVE = 32
+HTTP_KEEPALIVE_EXPIRY = 90
+HTTP_CONNECT_RETRIES = 2
+
+# Latest-items feed - polled once per interval for all monitoring users, fetched at most once per TTL
+FEED_POLL_INTERVAL = 30
+FEED_POLL_JITTER = 2  # +/- seconds, so restarted instances don't fall into lockstep against SCMM
+FEED_CACHE_TTL = 25
+FEED_PAGE_SIZE = 50
+
+# Creator caches - bounded so memory stays flat however many creators SCMM has
+CREATOR_CACHE_SIZE = 50_000
+CREATOR_CACHE_TTL = 3600
+CREATOR_VERDICT_TTL = 300  # first-time verdicts go stale as soon as the creator publishes again
+
+# Fernet tokens always start with the version byte and a zero high timestamp byte, i.e. 'gAAAAA'
+FERNET_TOKEN_PREFIX = 'gAAAAA'
+
+# SQLite - writes are applied by a single background thread on its own connection
+DB_PATH = 'rust_skin_bot.db'
+DB_CACHED_STATEMENTS = 256
+DB_WRITE_BATCH_WINDOW = 0.2  # seconds the writer keeps collecting after the first queued job
+DB_WRITE_BATCH_MAX = 500  # jobs per transaction, so a burst cannot hold the write lock indefinitely
+DB_READ_CONNECTIONS = 4  # reader threads, each with its own connection
+
+# Applied to every connection - WAL + relaxed sync means commits append to the log instead of
+# fsyncing a rollback journal; the rest are per-connection settings
+SQLITE_PRAGMAS = '''
+    PRAGMA journal_mode=WAL;
+    PRAGMA synchronous=NORMAL;
+    PRAGMA busy_timeout=30000;
+    PRAGMA temp_store=MEMORY;
+    PRAGMA cache_size=-64000;
+    PRAGMA mmap_size=268435456;
+    PRAGMA foreign_keys=ON;
+    PRAGMA wal_autocheckpoint=1000;
+    PRAGMA journal_size_limit=67108864;
+'''
+
+PROCESSED_SKINS_DDL = '''
+    CREATE TABLE IF NOT EXISTS {table} (
+        user_id INTEGER,
+        skin_id TEXT,
+        processed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (user_id, skin_id),
+        FOREIGN KEY (user_id) REFERENCES user_sessions (user_id)
+    ) WITHOUT ROWID
+'''
+
+# processed_skins rows are inserted with multi-row VALUES statements of these sizes only, so at most
+# four statement texts are ever compiled (a 50-item page is a single statement)
+PROCESSED_INSERT_BATCH_SIZES = (FEED_PAGE_SIZE, 16, 4, 1)
+
+# Alert-path writes - one fixed text each, so the writer's statement cache always reuses the compiled form
+UPSERT_CREATOR_SQL = '''
+    INSERT INTO creators 
+    (creator_id, creator_name, first_seen, skin_count) 
+    VALUES (?, ?, CAST(strftime('%s', 'now') AS INTEGER), ?)
+    ON CONFLICT(creator_id) DO UPDATE SET 
+        creator_name = excluded.creator_name, 
+        skin_count = excluded.skin_count
+'''
+INSERT_PURCHASE_SQL = '''
+    INSERT INTO purchases 
+    (user_id, skin_id, creator_id, creator_name, skin_name, purchase_time, price, success) 
+    VALUES (?, ?, ?, ?, ?, CAST(strftime('%s', 'now') AS INTEGER), ?, ?)
+'''
+INSERT_USER_SESSION_SQL = "INSERT INTO user_sessions (user_id, username) VALUES (?, ?)"
+PRUNE_PROCESSED_SKINS_SQL = "DELETE FROM processed_skins WHERE user_id = ? AND processed_at < datetime('now', ?)"
+DELETE_PROCESSED_SKINS_SQL = "DELETE FROM processed_skins WHERE user_id = ?"
+
+# Dirty purchased_count values are written back in one executemany per interval
+SESSION_FLUSH_INTERVAL = 5
+FLUSH_PURCHASED_COUNT_SQL = '''
+    UPDATE user_sessions SET purchased_count = ?, last_active = CURRENT_TIMESTAMP 
+    WHERE user_id = ?
+'''
+
+# user_sessions columns that update_user_session persists, in the order they appear in the UPDATE
+SESSION_COLUMNS = ('steam_session_token', 'is_monitoring', 'purchased_count', 'auto_purchase', 'max_price_cents', 'test_mode')
+
+# Processed item tracking - SQLite is the durable record, memory only covers the recent window
+PROCESSED_SKINS_LIMIT = 2000
+PROCESSED_PRUNE_EVERY_CYCLES = 120
+
+# A session row together with its most recently processed skins; callers append the WHERE clause
+SELECT_SESSIONS_SQL = '''
+    SELECT us.*, (
+        SELECT group_concat(skin_id) FROM (
+            SELECT skin_id FROM processed_skins 
+            WHERE user_id = us.user_id 
+            ORDER BY processed_at DESC 
+            LIMIT ?
+        )
+    ) AS recent_skins
+    FROM user_sessions us 
+'''
+
+# Reader-pool queries - fixed texts, so each reader connection compiles them once and reuses the plan
+CREATOR_EXISTS_SQL = "SELECT 1 FROM creators WHERE creator_id = ?"
+# purchase_time is epoch seconds, so a bound cutoff makes this a plain range scan on the covering index
+COUNT_RECENT_PURCHASES_SQL = '''
+    SELECT COUNT(*) FROM purchases 
+    WHERE user_id = ? AND purchase_time > ?
+'''
+# The in-memory LRU only holds the recent window, so the total comes from the table
+COUNT_PROCESSED_SKINS_SQL = "SELECT COUNT(*) FROM processed_skins WHERE user_id = ?"
+SELECT_RECENT_PURCHASES_SQL = '''
+    SELECT skin_name, creator_name, price, purchase_time, success 
+    FROM purchases 
+    WHERE user_id = ?
+    ORDER BY purchase_time DESC 
+    LIMIT 10
+'''
+
+# Alert sent for every first-time creator opportunity (MarkdownV2, fields pre-escaped)
+OPPORTUNITY_TEMPLATE = r"""{mode_emoji} *FIRST\-TIME CREATOR {mode_text}\!*
+
+🎨 *Item*: {item_name}
+👤 *Creator*: {creator_name}
+🏷️ *Type*: {item_type}
+📦 *Collection*: {item_collection}
+📅 *Age*: {item_age}
+{market_info}{purchase_details}📈 *Your Progress*: {purchased_count}/{max_purchases}
+
+🔗 *Links*:
+[Steam Market]({steam_url})
+[SCMM Item Page]({scmm_url}){workshop_link}
+
+{final_message_suffix}"""
+
+# /help replies (legacy Markdown) - fully static, sent as-is
+HELP_TEXT = """🤖 *Rust Skin Auto-Purchase Bot - Help*
+
+**🔧 Commands:**
+/start - Main menu and status
+/monitor - Start monitoring
+/stop - Stop monitoring
+/status - Check status
+/purchases - View opportunities
+/settoken - Set Steam token
+/reset - Reset counter
+/help - This help
+
+**🎯 How it works:**
+1. Monitors SCMM API for new items
+2. Targets first-time creators (≤1 item)
+3. Only considers recent items (≤7 days)
+4. Auto-purchases within your price limit
+5. Tracks up to 10 opportunities per user
+
+**🧪 Test Mode:**
+Enable to scan without purchasing - perfect for testing!"""
+
+HELP_INLINE_TEXT = """🤖 *Rust Skin Auto-Purchase Bot - Help*
+
+**🎯 Main Commands:**
+/start - Show main menu and status
+/monitor - Start monitoring and auto-purchasing
+/stop - Stop monitoring
+/status - Check your current status
+/purchases - View your purchase history
+/settoken - Set your Steam session token
+/reset - Reset your purchase counter
+/help - Show this help message
+
+**🔧 How Auto-Purchase Works:**
+1. I monitor the SCMM API every 30 seconds
+2. I look for items from creators with only 1 accepted item
+3. I only consider items that are 7 days old or newer
+4. If auto-purchase is enabled AND price ≤ your max price
+5. I automatically place a buy order on Steam Market
+6. You get notified of success/failure immediately
+7. I track up to 10 purchases per user
+
+**🧪 Test Mode:**
+• Enable test mode to scan without spending money
+• **SIMULATES purchases** with fake success/failure results
+• Perfect for testing the bot logic before going live
+• Shows detailed analysis of what would be purchased
+• No Steam token required in test mode
+
+**⚙️ Settings You Can Control:**
+• **Auto Purchase**: Enable/disable automatic buying
+• **Max Price**: Set maximum price per item ($0.50 - $500)
+• **Steam Token**: Your session for making purchases
+
+Need more help? Check the GitHub repository or contact support!"""
+
+# /settoken reply (legacy Markdown)
+SET_TOKEN_TEXT = """🔑 *Set Your Steam Session Token*
+
+**How to get your token:**
+1. Login to Steam in your browser
+2. Open Developer Tools (F12)
+3. Go to Application → Cookies → steamcommunity.com
+4. Find 'sessionid' cookie and copy its value
+
+**Now send me your token:**"""
+
+# Set Steam Token button reply (legacy Markdown)
+SET_TOKEN_INLINE_TEXT = """🔑 *Set Your Steam Session Token*
+
+**How to get your token:**
+1. Login to Steam in your browser
+2. Open Developer Tools (F12)
+3. Go to Application → Cookies → steamcommunity.com
+4. Find 'sessionid' cookie and copy its value
+
+**Now send me your token** (it will be stored securely):
+
+⚠️ *Make sure you're in a private chat - don't share tokens in groups!*"""
+
+# Reset Progress confirmation (legacy Markdown)
+RESET_CONFIRM_TEXT = """⚠️ *Reset Your Data*
+
+This will reset:
+• Your opportunity counter to 0
+• Your processed items list
+• Allow you to find 10 more opportunities
+
+Your Steam token and purchase history will be kept.
+
+Are you sure?"""
+
+# Set Max Price prompt (legacy Markdown)
+MAX_PRICE_PROMPT_TEXT = """💰 *Set Maximum Purchase Price*
+
+Send me the maximum price you want to spend per item (in USD).
+
+**Examples:**
+• `5` = $5.00
+• `10.50` = $10.50
+• `25` = $25.00
+
+*Send your max price now:*"""
+
+# Test Mode button replies (legacy Markdown)
+TEST_MODE_ENABLED_TEXT = """🧪 *Test Mode Enabled!*
+
+**What Test Mode Does:**
+• Scans SCMM for first-time creator items (expanded to 7 days!)
+• Shows you detailed info about what it finds
+• Reports item age, creator details, prices
+• **SIMULATES purchases** with fake success/failure results
+• Perfect for testing the bot logic without spending money
+
+**You'll see reports like:**
+✅ Found first-time creator: "ArtistName"
+📅 Item age: 2 days old (within 7 day limit)
+💰 Price: $5.50 (within your $10 budget)
+🧪 **SIMULATED SUCCESSFUL PURCHASE** (fake)
+🎯 This WOULD be a real purchase in live mode
+
+**Use ▶️ Start Monitoring to begin test scanning!**"""
+LIVE_MODE_ENABLED_TEXT = """💰 *Live Mode Enabled!*
+
+**What Live Mode Does:**
+• Scans SCMM for first-time creator items  
+• **ACTUALLY PURCHASES** qualifying items
+• Requires Steam session token
+• Uses Selenium for human-like purchasing
+
+**Make sure you:**
+✅ Set your Steam session token
+✅ Fund your Steam wallet
+✅ Configure your max price
+
+**Ready for real purchases!**"""
+
+# /start and main-menu reply (legacy Markdown)
+WELCOME_TEMPLATE = """🤖 *Welcome to Rust Skin Auto-Purchase Bot!*
+
+👋 Hello {username}! I find AND buy new skins from first-time creators automatically!
+
+📊 **Your Status:**
+{status_emoji} **Monitoring**: {monitoring_status}
+{token_emoji} **Steam Token**: {token_status}
+🤖 **Auto Purchase**: {auto_purchase_status}
+{test_emoji} **Mode**: {mode_status}
+💰 **Max Price**: ${max_price:.2f}
+🎯 **Progress**: {purchased_count}/{max_purchases} items
+
+🎨 **What I Do:**
+• Monitor SCMM for new items from first-time creators
+• Only consider items that are 7 days old or newer
+• {action_description}
+• Send instant notifications of {notification_type}
+• Track progress and stop after 10 successful actions
+
+**🚀 Quick Start:**
+1️⃣ {quick_start_1}
+2️⃣ Start monitoring with ▶️ Start Monitoring
+3️⃣ {quick_start_3}
+
+Use the buttons below or type /help for more info."""
+
+# /status reply (legacy Markdown)
+STATUS_TEMPLATE = """📊 *Your Bot Status*
+
+🤖 **Current State:**
+Status: {monitoring}
+Steam Token: {token}
+Mode: {mode}
+
+📈 **Progress:**
+Opportunities Found: {purchased_count}/{max_purchases}
+Found (last 24h): {recent_count}
+Processed Items: {processed_count}
+
+⚙️ **Settings:**
+Auto Purchase: {auto_purchase}
+Max Price: ${max_price:.2f}
+Max Item Age: {max_item_age_days} days"""
+
+# Steam Community Market (Rust app id 252490)
+STEAM_LISTING_URL = "https://steamcommunity.com/market/listings/252490/"
+STEAM_COOKIE_BOOTSTRAP_URL = "https://steamcommunity.com/favicon.ico"
+
+CHROME_ARGUMENTS = (
+    '--headless',
+    '--no-sandbox',
+    '--disable-dev-shm-usage',
+    '--disable-gpu',
+    '--window-size=1920,1080',
+    '--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+)
+
+@functools.lru_cache(maxsize=None)
+def _session_update_sql(columns: Tuple[str, ...]) -> str:
+    """UPDATE text for one combination of session columns, built once per combination"""
+    assignments = ''.join(f"{column} = ?, " for column in columns)
+    return f"UPDATE user_sessions SET {assignments}last_active = CURRENT_TIMESTAMP WHERE user_id = ?"
+
+@functools.lru_cache(maxsize=None)
+def _insert_processed_skins_sql(row_count: int) -> str:
+    """Multi-row INSERT for processed_skins, built once per batch size"""
+    return "INSERT OR IGNORE INTO processed_skins (user_id, skin_id) VALUES " + ", ".join(["(?, ?)"] * row_count)
+
+@functools.lru_cache(maxsize=None)
+def _processed_skins_in_sql(id_count: int) -> str:
+    """SELECT of the already-processed ids among id_count candidates, built once per count"""
+    return ("SELECT skin_id FROM processed_skins WHERE user_id = ? AND skin_id IN ("
+            + ", ".join(["?"] * id_count) + ")")
+
+def _processed_skins_statements(rows: List[Tuple]) -> List[Tuple[str, Tuple]]:
+    """Split (user_id, skin_id) rows into multi-row INSERTs using the fixed batch sizes"""
+    statements = []
+    start = 0
+    for size in PROCESSED_INSERT_BATCH_SIZES:
+        while len(rows) - start >= size:
+            batch = rows[start:start + size]
+            statements.append((_insert_processed_skins_sql(size), tuple(value for row in batch for value in row)))
+            start += size
+    return statements
+
+# Users flip between menu screens without changing anything, so the same welcome text is rendered repeatedly
+@functools.lru_cache(maxsize=4096)
+def _render_welcome(username: str, is_monitoring: bool, has_token: bool, auto_purchase: bool,
+                    max_price_cents: int, test_mode: bool, purchased_count: int, max_purchases: int) -> str:
+    """Welcome text for one combination of session state"""
+    return WELCOME_TEMPLATE.format_map({
+        'username': username,
+        'status_emoji': "🟢" if is_monitoring else "🔴",
+        'token_emoji': "✅" if has_token else "❌",
+        'test_emoji': "🧪" if test_mode else "💰",
+        'monitoring_status': 'Active' if is_monitoring else 'Stopped',
+        'token_status': 'Configured' if has_token else 'Not Set',
+        'auto_purchase_status': '✅ Enabled' if auto_purchase else '❌ Disabled',
+        'mode_status': '🧪 Test Mode (No Purchases)' if test_mode else '💰 Live Mode',
+        'max_price': max_price_cents / 100,
+        'purchased_count': purchased_count,
+        'max_purchases': max_purchases,
+        'action_description': 'Show you opportunities without purchasing (TEST MODE)' if test_mode else 'Automatically purchase items within your price limit',
+        'notification_type': 'findings' if test_mode else 'purchases/opportunities',
+        'quick_start_1': "You're in test mode - perfect for testing!" if test_mode else 'Enable 🧪 Test Mode to scan without purchasing',
+        'quick_start_3': "I'll show you what I find without buying anything!" if test_mode else 'Set your Steam token and configure auto-purchase',
+    })
+
+def _creator_key(creator_id) -> Union[int, str]:
+    """In-memory key for a creator - Steam IDs as ints, anything non-numeric as an interned string"""
+    try:
+        return int(creator_id)
+    except (TypeError, ValueError):
+        return sys.intern(str(creator_id))
+
+def _md_escape(text) -> str:
+    """Escape user-controlled text for Telegram MarkdownV2"""
+    return escape_markdown(str(text), version=2)
+
+def _md_escape_url(url: str) -> str:
+    """Escape a URL for use inside a MarkdownV2 inline link"""
+    return escape_markdown(url, version=2, entity_type='text_link')
+
+class TokenBucket:
+    """Simple asyncio token bucket used to pace outbound API calls"""
+    
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated_at = time.monotonic()
+        self.lock = asyncio.Lock()
+    
+    async def acquire(self):
+        """Wait until a token is available and consume it"""
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+class RecentIds:
+    """Bounded set of item IDs that forgets the least recently seen once full"""
+    
+    def __init__(self, maxsize: int, ids=()):
+        self.maxsize = maxsize
+        self.ids = OrderedDict()
+        for item_id in ids:
+            self.add(item_id)
+    
+    def __contains__(self, item_id) -> bool:
+        if item_id in self.ids:
+            self.ids.move_to_end(item_id)
+            return True
+        return False
+    
+    def __len__(self) -> int:
+        return len(self.ids)
+    
+    def add(self, item_id):
+        """Remember an ID, evicting the oldest one when over capacity"""
+        self.ids[item_id] = None
+        self.ids.move_to_end(item_id)
+        if len(self.ids) > self.maxsize:
+            self.ids.popitem(last=False)
+    
+    def clear(self):
+        self.ids.clear()
+
+@dataclass(slots=True)
+class UserSession:
+    """In-memory state for one user; the persisted fields mirror the user_sessions columns"""
+    user_id: int
+    username: Optional[str] = None
+    steam_session_token: Optional[str] = None
+    is_monitoring: bool = False
+    purchased_count: int = 0
+    max_purchases: int = 10
+    auto_purchase: bool = True
+    max_price_cents: int = 1000
+    max_item_age_days: int = 7
+    test_mode: bool = False
+    processed_skins: RecentIds = field(default_factory=lambda: RecentIds(PROCESSED_SKINS_LIMIT))
+    feed_head: Optional[str] = None  # id of the newest feed item already handled
+
 class RustSkinTelegramBot:
     def __init__(self):
         self.bot_token = os.getenv('TELEGRAM_BOT_TOKEN')
         self.api_base = "https://rust.scmm.app/api"
         
+        # Steam tokens are encrypted at rest when a key is configured
+        self.token_cipher = None
+        encryption_key = os.getenv('BOT_ENCRYPTION_KEY')
+        if encryption_key:
+            if Fernet is None:
+                logger.warning("BOT_ENCRYPTION_KEY is set but cryptography is not installed - tokens stay in plain text")
+            else:
+                self.token_cipher = Fernet(encryption_key)
+        
         # Bot state - now per user
-        self.user_sessions = {}  # user_id -> session data
-        self.known_creators = set()  # Global creator cache
-        self.monitoring_tasks = {}  # user_id -> asyncio task
+        self.user_sessions: Dict[int, UserSession] = {}  # user_id -> session state
+        # Keyed by _creator_key(creator_id): a small int hashes faster and takes less memory than its digits
+        self.known_creators = TTLCache(maxsize=CREATOR_CACHE_SIZE, ttl=CREATOR_CACHE_TTL)  # creator key -> True
+        self.creator_verdicts = TTLCache(maxsize=CREATOR_CACHE_SIZE, ttl=CREATOR_VERDICT_TTL)  # creator key -> first-time verdict
+        self._creator_lookups: Dict[Union[int, str], asyncio.Future] = {}  # creator key -> lookup shared by concurrent callers
+        
+        # Shared async HTTP client (created once the event loop is running)
+        self.http: Optional[httpx.AsyncClient] = None
+        
+        # SCMM request throttling
+        self._scmm_sem = asyncio.Semaphore(SCMM_MAX_CONCURRENCY)
+        
+        # Latest-items feed shared by all monitoring users
+        self._feed_items: List[Dict] = []
+        self._feed_fetched_at = 0.0
+        self._feed_validators: Dict[str, str] = {}  # conditional request headers from the last 200
+        self._feed_lock = asyncio.Lock()
+        self.poller_task = None  # single feed poller, running only while someone is monitoring
+        self.monitoring_users: Set[int] = set()  # user_ids the feed poller serves
+        self._feed_wake = asyncio.Event()  # set to start the next poll cycle without waiting out the interval
+        
+        # Outbound Telegram messages are buffered per chat and delivered by a small worker pool
+        self.tg_queue = asyncio.Queue()  # chat ids whose batch window has closed
+        self.tg_pending = {}  # user_id -> messages waiting to be sent
+        self.tg_flush_handles = {}  # user_id -> timer that queues the chat for delivery
+        self.tg_next_send = {}  # user_id -> earliest monotonic time the chat may receive another message
+        self.tg_rate_limiter = TokenBucket(TG_MESSAGES_PER_SECOND, TG_MESSAGES_PER_SECOND)
+        self.tg_workers = []
         
         # Initialize database
         self.init_database()
         self.load_global_state()
         
+        # Writes are queued and committed off the event loop
+        self.db_queue = queue.Queue()  # ([(sql, params, many)], future) jobs, each applied atomically
+        self.db_writer = threading.Thread(target=self._db_writer_loop, name="db-writer", daemon=True)
+        self.dirty_sessions: Set[int] = set()  # user_ids whose purchased_count is ahead of the database
+        self.processed_buffer: List[Tuple[int, str]] = []  # (user_id, skin_id) rows seen this poll cycle
+        self.session_flush_task = None
+        self.db_writer.start()
+        
+        # Handler queries run on a small pool of reader threads, each with its own connection (WAL lets
+        # them read while the writer commits), so a slow SELECT never stalls the event loop
+        self._read_local = threading.local()  # reader thread -> its connection
+        self._read_conns: List[sqlite3.Connection] = []  # every reader connection, closed on shutdown
+        self.db_reader = concurrent.futures.ThreadPoolExecutor(
+            max_workers=DB_READ_CONNECTIONS, thread_name_prefix="db-reader", initializer=self._open_read_connection
+        )
+        
         # Setup telegram application
-        self.application = Application.builder().token(self.bot_token).build()
+        self.application = (
+            Application.builder()
+            .token(self.bot_token)
+            .post_init(self.post_init)
+            .post_stop(self.post_stop)
+            .post_shutdown(self.post_shutdown)
+            .build()
+        )
         self.setup_handlers()
+        
+        # Button callback_data -> inline handler, looked up once per press
+        self.callback_handlers = {
+            "status": self.show_status_inline,
+            "purchases": self.show_purchases_inline,
+            "settings": self.show_settings_menu,
+            "toggle_auto_purchase": self.toggle_auto_purchase,
+            "startbot": self.start_monitoring_inline,
+            "stopbot": self.stop_monitoring_inline,
+            "help": self.show_help_inline,
+            "test_mode": self.toggle_test_mode,
+            "reset": self.show_reset_confirmation,
+            "back_main": self.show_main_menu_inline,
+        }
+        # Handlers that also need the callback context to set a pending text prompt
+        self.context_callback_handlers = {
+            "settoken": self.show_settoken_inline,
+            "set_max_price": self.set_max_price_prompt,
+        }
+        
+        # Menus that never change are built once and shared by every reply
+        self.main_menu_markup = InlineKeyboardMarkup([
+            [InlineKeyboardButton("📊 My Status", callback_data="status"),
+             InlineKeyboardButton("🛍️ My Purchases", callback_data="purchases")],
+            [InlineKeyboardButton("🔑 Set Steam Token", callback_data="settoken"),
+             InlineKeyboardButton("⚙️ Settings", callback_data="settings")],
+            [InlineKeyboardButton("▶️ Start Monitoring", callback_data="startbot"),
+             InlineKeyboardButton("⏹️ Stop Monitoring", callback_data="stopbot")],
+            [InlineKeyboardButton("🧪 Test Mode", callback_data="test_mode"),
+             InlineKeyboardButton("❓ Help", callback_data="help")]
+        ])
+        self.back_main_markup = InlineKeyboardMarkup([[InlineKeyboardButton("🔙 Back to Main", callback_data="back_main")]])
+        self.back_settings_markup = InlineKeyboardMarkup([[InlineKeyboardButton("🔙 Back to Settings", callback_data="settings")]])
+        self.reset_confirm_markup = InlineKeyboardMarkup([
+            [InlineKeyboardButton("✅ Yes, Reset Everything", callback_data="reset_confirm")],
+            [InlineKeyboardButton("❌ Cancel", callback_data="reset_cancel")],
+            [InlineKeyboardButton("🔙 Back to Settings", callback_data="settings")]
+        ])
     
     def init_database(self):
         """Initialize SQLite database with multi-user support"""
-        self.conn = sqlite3.connect('rust_skin_bot.db', check_same_thread=False)
+        self.conn = sqlite3.connect(DB_PATH, check_same_thread=False, cached_statements=DB_CACHED_STATEMENTS)
+        self.conn.row_factory = sqlite3.Row
+        
+        self.conn.executescript(SQLITE_PRAGMAS)
+        journal_mode = self.conn.execute("PRAGMA journal_mode").fetchone()[0]
+        logger.info(f"SQLite journal mode: {journal_mode}")
+        
         cursor = self.conn.cursor()
         
         # User sessions table
@@ -73,7 +677,7 @@ class RustSkinTelegramBot:
             CREATE TABLE IF NOT EXISTS creators (
                 creator_id TEXT PRIMARY KEY,
                 creator_name TEXT,
-                first_seen TIMESTAMP,
+                first_seen INTEGER,
                 skin_count INTEGER DEFAULT 1
             )
         ''')
@@ -87,112 +691,187 @@ class RustSkinTelegramBot:
                 creator_id TEXT,
                 creator_name TEXT,
                 skin_name TEXT,
-                purchase_time TIMESTAMP,
+                purchase_time INTEGER,
                 price REAL,
                 success BOOLEAN,
                 FOREIGN KEY (user_id) REFERENCES user_sessions (user_id)
             )
         ''')
         
-        # Processed skins per user
+        # Processed skins per user - clustered on its key, so no separate rowid B-tree
+        cursor.execute(PROCESSED_SKINS_DDL.format(table='processed_skins'))
+        self.migrate_processed_skins_without_rowid()
+        
+        # /purchases is answered from the index alone; it supersedes the narrower (user_id, purchase_time) one
+        cursor.execute("DROP INDEX IF EXISTS idx_purchases_user_time")
         cursor.execute('''
-            CREATE TABLE IF NOT EXISTS processed_skins (
-                user_id INTEGER,
-                skin_id TEXT,
-                processed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                PRIMARY KEY (user_id, skin_id),
-                FOREIGN KEY (user_id) REFERENCES user_sessions (user_id)
-            )
+            CREATE INDEX IF NOT EXISTS idx_purchases_cover 
+            ON purchases (user_id, purchase_time DESC, success, price, skin_name, creator_name)
         ''')
         
+        # Recent-window session loads and pruning order/filter processed_skins by processed_at
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_processed_user_time 
+            ON processed_skins (user_id, processed_at)
+        ''')
+        
+        # load_global_state seeds the creator cache newest-first
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_creators_first_seen 
+            ON creators (first_seen)
+        ''')
+        
+        # Timestamps are stored as unix seconds; convert rows written by older versions
+        cursor.execute('''
+            UPDATE purchases SET purchase_time = CAST(strftime('%s', purchase_time) AS INTEGER)
+            WHERE typeof(purchase_time) = 'text'
+        ''')
+        cursor.execute('''
+            UPDATE creators SET first_seen = CAST(strftime('%s', first_seen) AS INTEGER)
+            WHERE typeof(first_seen) = 'text'
+        ''')
+        
+        self.encrypt_plaintext_tokens()
+        
         self.conn.commit()
+        
+        # Gather planner statistics the first time; PRAGMA optimize keeps them current afterwards
+        if not cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'").fetchone():
+            cursor.execute("ANALYZE")
+    
+    def migrate_processed_skins_without_rowid(self):
+        """Rebuild a processed_skins table created by older versions as WITHOUT ROWID"""
+        row = self.conn.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'processed_skins'"
+        ).fetchone()
+        if 'WITHOUT ROWID' in row[0].upper():
+            return
+        
+        logger.info("Migrating processed_skins to a WITHOUT ROWID table")
+        self.conn.executescript(f'''
+            PRAGMA foreign_keys=OFF;
+            BEGIN;
+            {PROCESSED_SKINS_DDL.format(table='processed_skins_new')};
+            INSERT OR IGNORE INTO processed_skins_new (user_id, skin_id, processed_at)
+                SELECT user_id, skin_id, processed_at FROM processed_skins;
+            DROP TABLE processed_skins;
+            ALTER TABLE processed_skins_new RENAME TO processed_skins;
+            COMMIT;
+            PRAGMA foreign_keys=ON;
+        ''')
+    
+    def encrypt_plaintext_tokens(self):
+        """Encrypt Steam tokens saved before an encryption key was configured"""
+        if self.token_cipher is None:
+            return
+        
+        rows = self.conn.execute('''
+            SELECT user_id, steam_session_token FROM user_sessions 
+            WHERE steam_session_token != '' AND steam_session_token NOT LIKE ?
+        ''', (FERNET_TOKEN_PREFIX + '%',)).fetchall()
+        if rows:
+            self.conn.executemany(
+                "UPDATE user_sessions SET steam_session_token = ? WHERE user_id = ?",
+                [(self.encrypt_token(token), user_id) for user_id, token in rows]
+            )
+            logger.info(f"Encrypted {len(rows)} stored Steam tokens")
     
     def load_global_state(self):
         """Load global creator data"""
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT creator_id FROM creators")
-        self.known_creators = {row[0] for row in cursor.fetchall()}
+        rows = self.conn.execute(
+            "SELECT creator_id FROM creators ORDER BY first_seen DESC LIMIT ?", (CREATOR_CACHE_SIZE,)
+        )
+        for row in rows:
+            self.known_creators[_creator_key(row[0])] = True
         logger.info(f"Loaded {len(self.known_creators)} known creators from database")
     
-    def get_user_session(self, user_id: int, username: str = None):
+    def get_user_session(self, user_id: int, username: str = None) -> UserSession:
         """Get or create user session"""
         if user_id not in self.user_sessions:
-            # Load from database
-            cursor = self.conn.cursor()
-            cursor.execute("SELECT * FROM user_sessions WHERE user_id = ?", (user_id,))
-            row = cursor.fetchone()
+            # Load the session row and its most recently processed skins in one query
+            row = self.conn.execute(
+                SELECT_SESSIONS_SQL + "WHERE us.user_id = ?", (PROCESSED_SKINS_LIMIT, user_id)
+            ).fetchone()
             
             if row:
-                self.user_sessions[user_id] = {
-                    'user_id': row[0],
-                    'username': row[1],
-                    'steam_session_token': row[2],
-                    'is_monitoring': row[3],
-                    'purchased_count': row[4],
-                    'max_purchases': row[5],
-                    'auto_purchase': row[6] if len(row) > 6 else True,
-                    'max_price_cents': row[7] if len(row) > 7 else 1000,
-                    'max_item_age_days': row[8] if len(row) > 8 else 7,
-                    'test_mode': row[9] if len(row) > 9 else False,
-                    'processed_skins': set()
-                }
-                
-                # Load processed skins for this user
-                cursor.execute("SELECT skin_id FROM processed_skins WHERE user_id = ?", (user_id,))
-                self.user_sessions[user_id]['processed_skins'] = {row[0] for row in cursor.fetchall()}
+                self.user_sessions[user_id] = self.session_from_row(row)
             else:
                 # Create new user session
-                self.user_sessions[user_id] = {
-                    'user_id': user_id,
-                    'username': username,
-                    'steam_session_token': None,
-                    'is_monitoring': False,
-                    'purchased_count': 0,
-                    'max_purchases': 10,
-                    'auto_purchase': True,
-                    'max_price_cents': 1000,
-                    'max_item_age_days': 7,
-                    'test_mode': False,
-                    'processed_skins': set()
-                }
+                self.user_sessions[user_id] = UserSession(user_id=user_id, username=username)
                 
                 # Save to database
-                cursor.execute('''
-                    INSERT INTO user_sessions (user_id, username) 
-                    VALUES (?, ?)
-                ''', (user_id, username))
-                self.conn.commit()
+                self._db_write((INSERT_USER_SESSION_SQL, (user_id, username)))
         
         return self.user_sessions[user_id]
     
+    def session_from_row(self, row: sqlite3.Row) -> UserSession:
+        """Build a UserSession from a SELECT_SESSIONS_SQL row"""
+        # Databases created by older versions may lack the later columns
+        columns = row.keys()
+        recent_skins = row['recent_skins'].split(',') if row['recent_skins'] else []
+        return UserSession(
+            user_id=row['user_id'],
+            username=row['username'],
+            steam_session_token=self.decrypt_token(row['steam_session_token']),
+            is_monitoring=row['is_monitoring'],
+            purchased_count=row['purchased_count'],
+            max_purchases=row['max_purchases'],
+            auto_purchase=row['auto_purchase'] if 'auto_purchase' in columns else True,
+            max_price_cents=row['max_price_cents'] if 'max_price_cents' in columns else 1000,
+            max_item_age_days=row['max_item_age_days'] if 'max_item_age_days' in columns else 7,
+            test_mode=row['test_mode'] if 'test_mode' in columns else False,
+            # Oldest first so the LRU evicts in the right order
+            processed_skins=RecentIds(PROCESSED_SKINS_LIMIT, reversed(recent_skins))
+        )
+    
     def update_user_session(self, user_id: int, **kwargs):
         """Update user session in memory and database"""
         session = self.get_user_session(user_id)
         
         # Update session data
         for key, value in kwargs.items():
-            if key in session:
-                session[key] = value
+            if hasattr(session, key):
+                setattr(session, key, value)
         
         # Update database
-        cursor = self.conn.cursor()
-        
-        # Build dynamic SQL for updates
-        updates = []
-        values = []
-        
-        for key, value in kwargs.items():
-            if key in ['steam_session_token', 'is_monitoring', 'purchased_count', 'auto_purchase', 'max_price_cents', 'test_mode']:
-                updates.append(f"{key} = ?")
-                values.append(value)
-        
-        if updates:
-            updates.append("last_active = CURRENT_TIMESTAMP")
-            values.append(user_id)
-            
-            sql = f"UPDATE user_sessions SET {', '.join(updates)} WHERE user_id = ?"
-            cursor.execute(sql, values)
-            self.conn.commit()
+        statement = self.session_columns_statement(user_id, **kwargs)
+        if statement:
+            self._db_write(statement)
+    
+    def session_columns_statement(self, user_id: int, **kwargs) -> Optional[Tuple[str, List]]:
+        """Build the UPDATE for persisted session columns, or None if nothing needs writing"""
+        # Fixed column order keeps the SQL text identical for the same set of changes
+        columns = tuple(column for column in SESSION_COLUMNS if column in kwargs)
+        if not columns:
+            return None
+        
+        values = [kwargs[column] for column in columns]
+        if 'steam_session_token' in kwargs:
+            values[columns.index('steam_session_token')] = self.encrypt_token(kwargs['steam_session_token'])
+        values.append(user_id)
+        return _session_update_sql(columns), values
+    
+    def encrypt_token(self, token: Optional[str]) -> Optional[str]:
+        """Encrypt a Steam token for storage (unchanged when no key is configured)"""
+        if not token or self.token_cipher is None:
+            return token
+        return self.token_cipher.encrypt(token.encode()).decode()
+    
+    def decrypt_token(self, stored: Optional[str]) -> Optional[str]:
+        """Decrypt a stored Steam token; one that cannot be decrypted is treated as not set"""
+        if not stored:
+            return stored
+        # Ciphertext must never reach Steam as a session cookie, so a token that cannot be decrypted counts as unset
+        if self.token_cipher is None:
+            if stored.startswith(FERNET_TOKEN_PREFIX):
+                logger.error("Stored Steam token is encrypted but BOT_ENCRYPTION_KEY is not set - ignoring it")
+                return None
+            return stored
+        try:
+            return self.token_cipher.decrypt(stored.encode()).decode()
+        except InvalidToken:
+            logger.error("Stored Steam token could not be decrypted - BOT_ENCRYPTION_KEY is wrong or was changed; ignoring it")
+            return None
     
     def setup_handlers(self):
         """Setup Telegram bot handlers"""
@@ -213,130 +892,71 @@ class RustSkinTelegramBot:
         username = update.effective_user.username or update.effective_user.first_name
         session = self.get_user_session(user_id, username)
         
-        keyboard = [
-            [InlineKeyboardButton("📊 My Status", callback_data="status"),
-             InlineKeyboardButton("🛍️ My Purchases", callback_data="purchases")],
-            [InlineKeyboardButton("🔑 Set Steam Token", callback_data="settoken"),
-             InlineKeyboardButton("⚙️ Settings", callback_data="settings")],
-            [InlineKeyboardButton("▶️ Start Monitoring", callback_data="startbot"),
-             InlineKeyboardButton("⏹️ Stop Monitoring", callback_data="stopbot")],
-            [InlineKeyboardButton("🧪 Test Mode", callback_data="test_mode"),
-             InlineKeyboardButton("❓ Help", callback_data="help")]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        
-        status_emoji = "🟢" if session['is_monitoring'] else "🔴"
-        token_emoji = "✅" if session['steam_session_token'] else "❌"
-        test_emoji = "🧪" if session.get('test_mode', False) else "💰"
-        
-        # Prepare text parts to avoid backslashes in f-strings
-        monitoring_status = 'Active' if session['is_monitoring'] else 'Stopped'
-        token_status = 'Configured' if session['steam_session_token'] else 'Not Set'
-        auto_purchase_status = '✅ Enabled' if session.get('auto_purchase', True) else '❌ Disabled'
-        mode_status = '🧪 Test Mode (No Purchases)' if session.get('test_mode', False) else '💰 Live Mode'
-        max_price = session.get('max_price_cents', 1000) / 100
-        
-        test_mode = session.get('test_mode', False)
-        action_description = 'Show you opportunities without purchasing (TEST MODE)' if test_mode else 'Automatically purchase items within your price limit'
-        notification_type = 'findings' if test_mode else 'purchases/opportunities'
-        
-        quick_start_1 = 'Enable 🧪 Test Mode to scan without purchasing' if not test_mode else "You're in test mode - perfect for testing!"
-        quick_start_3 = "I'll show you what I find without buying anything!" if test_mode else 'Set your Steam token and configure auto-purchase'
-        
-        welcome_text = f"""🤖 *Welcome to Rust Skin Auto-Purchase Bot!*
-
-👋 Hello {username}! I find AND buy new skins from first-time creators automatically!
-
-📊 **Your Status:**
-{status_emoji} **Monitoring**: {monitoring_status}
-{token_emoji} **Steam Token**: {token_status}
-🤖 **Auto Purchase**: {auto_purchase_status}
-{test_emoji} **Mode**: {mode_status}
-💰 **Max Price**: ${max_price:.2f}
-🎯 **Progress**: {session['purchased_count']}/{session['max_purchases']} items
-
-🎨 **What I Do:**
-• Monitor SCMM for new items from first-time creators
-• Only consider items that are 7 days old or newer
-• {action_description}
-• Send instant notifications of {notification_type}
-• Track progress and stop after 10 successful actions
-
-**🚀 Quick Start:**
-1️⃣ {quick_start_1}
-2️⃣ Start monitoring with ▶️ Start Monitoring
-3️⃣ {quick_start_3}
-
-Use the buttons below or type /help for more info."""
+        welcome_text = _render_welcome(
+            username, session.is_monitoring, bool(session.steam_session_token), session.auto_purchase,
+            session.max_price_cents, session.test_mode, session.purchased_count, session.max_purchases
+        )
 
         await update.message.reply_text(
             welcome_text,
             parse_mode='Markdown',
-            reply_markup=reply_markup
+            reply_markup=self.main_menu_markup
         )
     
     async def status_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /status command"""
-        user_id = update.effective_user.id
+        status_text = await self.render_status(update.effective_user.id)
+        await update.message.reply_text(status_text, parse_mode='Markdown')
+    
+    async def render_status(self, user_id: int) -> str:
+        """Build the status text shared by /status and the status button"""
         session = self.get_user_session(user_id)
         
-        status_text = f"""📊 *Your Bot Status*
-
-🤖 **Current State:**
-Status: {'🟢 Active' if session['is_monitoring'] else '🔴 Stopped'}
-Steam Token: {'✅ Set' if session['steam_session_token'] else '❌ Not Set'}
-Mode: {'🧪 Test Mode' if session.get('test_mode', False) else '💰 Live Mode'}
-
-📈 **Progress:**
-Opportunities Found: {session['purchased_count']}/{session['max_purchases']}
-Processed Items: {len(session['processed_skins'])}
-
-⚙️ **Settings:**
-Auto Purchase: {'✅ Enabled' if session.get('auto_purchase', True) else '❌ Disabled'}
-Max Price: ${session.get('max_price_cents', 1000)/100:.2f}
-Max Item Age: {session.get('max_item_age_days', 7)} days"""
-
-        await update.message.reply_text(status_text, parse_mode='Markdown')
+        recent, processed = await asyncio.gather(
+            self._db_read(COUNT_RECENT_PURCHASES_SQL, (user_id, int(time.time()) - 86400)),
+            self._db_read(COUNT_PROCESSED_SKINS_SQL, (user_id,))
+        )
+        
+        return STATUS_TEMPLATE.format_map({
+            'monitoring': '🟢 Active' if session.is_monitoring else '🔴 Stopped',
+            'token': '✅ Set' if session.steam_session_token else '❌ Not Set',
+            'mode': '🧪 Test Mode' if session.test_mode else '💰 Live Mode',
+            'purchased_count': session.purchased_count,
+            'max_purchases': session.max_purchases,
+            'recent_count': recent[0][0],
+            'processed_count': processed[0][0],
+            'auto_purchase': '✅ Enabled' if session.auto_purchase else '❌ Disabled',
+            'max_price': session.max_price_cents / 100,
+            'max_item_age_days': session.max_item_age_days,
+        })
     
     async def set_token_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /settoken command"""
         context.user_data['waiting_for_token'] = True
         
-        token_text = """🔑 *Set Your Steam Session Token*
-
-**How to get your token:**
-1. Login to Steam in your browser
-2. Open Developer Tools (F12)
-3. Go to Application → Cookies → steamcommunity.com
-4. Find 'sessionid' cookie and copy its value
-
-**Now send me your token:**"""
-        
-        await update.message.reply_text(token_text, parse_mode='Markdown')
+        await update.message.reply_text(SET_TOKEN_TEXT, parse_mode='Markdown')
     
     async def start_monitoring_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /monitor command"""
         user_id = update.effective_user.id
         session = self.get_user_session(user_id)
         
-        if session['is_monitoring']:
+        if session.is_monitoring:
             await update.message.reply_text("⚠️ You're already monitoring! Use /stop to stop.")
             return
         
-        if not session.get('test_mode', False) and not session['steam_session_token']:
+        if not session.test_mode and not session.steam_session_token:
             await update.message.reply_text("❌ Please set your Steam token first with /settoken\n\n(Or enable test mode with the 🧪 Test Mode button)")
             return
         
-        if session['purchased_count'] >= session['max_purchases']:
-            await update.message.reply_text(f"🛑 You've reached the limit of {session['max_purchases']} opportunities! Use /reset to reset your counter.")
+        if session.purchased_count >= session.max_purchases:
+            await update.message.reply_text(f"🛑 You've reached the limit of {session.max_purchases} opportunities! Use /reset to reset your counter.")
             return
         
         # Start monitoring
-        self.update_user_session(user_id, is_monitoring=True)
-        task = asyncio.create_task(self.monitor_user_skins(user_id))
-        self.monitoring_tasks[user_id] = task
+        self.start_monitoring(user_id)
         
-        mode_text = "🧪 TEST MODE" if session.get('test_mode', False) else "💰 LIVE MODE"
+        mode_text = "🧪 TEST MODE" if session.test_mode else "💰 LIVE MODE"
         await update.message.reply_text(f"🚀 *Monitoring started in {mode_text}!*\n\nI'm now scanning for first-time creator opportunities.", parse_mode='Markdown')
     
     async def stop_monitoring_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -344,84 +964,47 @@ Max Item Age: {session.get('max_item_age_days', 7)} days"""
         user_id = update.effective_user.id
         session = self.get_user_session(user_id)
         
-        if not session['is_monitoring']:
+        if not session.is_monitoring:
             await update.message.reply_text("⚠️ You're not currently monitoring.")
             return
         
         # Stop monitoring
-        self.update_user_session(user_id, is_monitoring=False)
-        if user_id in self.monitoring_tasks:
-            self.monitoring_tasks[user_id].cancel()
-            del self.monitoring_tasks[user_id]
+        self.stop_monitoring(user_id)
         
         await update.message.reply_text("⏹️ *Monitoring stopped.*", parse_mode='Markdown')
     
     async def purchases_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /purchases command"""
-        user_id = update.effective_user.id
-        
-        cursor = self.conn.cursor()
-        cursor.execute('''
-            SELECT skin_name, creator_name, price, purchase_time, success 
-            FROM purchases 
-            WHERE user_id = ?
-            ORDER BY purchase_time DESC 
-            LIMIT 10
-        ''', (user_id,))
-        purchases = cursor.fetchall()
+        text = await self.render_purchases(update.effective_user.id)
+        await update.message.reply_text(text, parse_mode='Markdown')
+    
+    async def render_purchases(self, user_id: int) -> str:
+        """Build the recent opportunities text shared by /purchases and the purchases button"""
+        purchases = await self._db_read(SELECT_RECENT_PURCHASES_SQL, (user_id,))
         
         if not purchases:
-            await update.message.reply_text("📭 *No opportunities found yet.*\n\nStart monitoring to begin!", parse_mode='Markdown')
-        else:
-            text = "🛍️ *Your Recent Opportunities*\n\n"
-            for skin_name, creator_name, price, purchase_time, success in purchases:
-                status = "✅" if success else "🔍"
-                price_text = f"${price:.2f}" if price > 0 else "N/A"
-                text += f"{status} **{skin_name}** by {creator_name} - {price_text}\n"
-            
-            await update.message.reply_text(text, parse_mode='Markdown')
+            return "📭 *No opportunities found yet.*\n\nStart monitoring to begin!"
+        
+        text = "🛍️ *Your Recent Opportunities*\n\n"
+        for skin_name, creator_name, price, purchase_time, success in purchases:
+            status = "✅" if success else "🔍"
+            price_text = f"${price:.2f}" if price > 0 else "N/A"
+            found_at = self.format_timestamp(purchase_time)
+            text += f"{status} **{skin_name}** by {creator_name} - {price_text} ({found_at})\n"
+        return text
     
     async def reset_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /reset command"""
         user_id = update.effective_user.id
         
         # Reset user data
-        self.update_user_session(user_id, purchased_count=0)
-        session = self.get_user_session(user_id)
-        session['processed_skins'].clear()
-        
-        # Clear processed skins from database
-        cursor = self.conn.cursor()
-        cursor.execute("DELETE FROM processed_skins WHERE user_id = ?", (user_id,))
-        self.conn.commit()
+        await self.reset_user_progress(user_id)
         
         await update.message.reply_text("✅ *Your progress has been reset!* You can now find 10 more opportunities.", parse_mode='Markdown')
     
     async def help_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /help command"""
-        help_text = """🤖 *Rust Skin Auto-Purchase Bot - Help*
-
-**🔧 Commands:**
-/start - Main menu and status
-/monitor - Start monitoring
-/stop - Stop monitoring
-/status - Check status
-/purchases - View opportunities
-/settoken - Set Steam token
-/reset - Reset counter
-/help - This help
-
-**🎯 How it works:**
-1. Monitors SCMM API for new items
-2. Targets first-time creators (≤1 item)
-3. Only considers recent items (≤7 days)
-4. Auto-purchases within your price limit
-5. Tracks up to 10 opportunities per user
-
-**🧪 Test Mode:**
-Enable to scan without purchasing - perfect for testing!"""
-
-        await update.message.reply_text(help_text, parse_mode='Markdown')
+        await update.message.reply_text(HELP_TEXT, parse_mode='Markdown')
     
     async def button_callback(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle button callbacks"""
@@ -431,80 +1014,49 @@ Enable to scan without purchasing - perfect for testing!"""
         user_id = update.effective_user.id
         
         try:
-            if query.data == "status":
-                await self.show_status_inline(query)
-            elif query.data == "purchases":
-                await self.show_purchases_inline(query)
-            elif query.data == "settoken":
-                await self.show_settoken_inline(query, context)
-            elif query.data == "settings":
-                await self.show_settings_menu(query)
-            elif query.data == "toggle_auto_purchase":
-                await self.toggle_auto_purchase(query)
-            elif query.data == "set_max_price":
-                await self.set_max_price_prompt(query, context)
-            elif query.data == "startbot":
-                await self.start_monitoring_inline(query)
-            elif query.data == "stopbot":
-                await self.stop_monitoring_inline(query)
-            elif query.data == "help":
-                await self.show_help_inline(query)
-            elif query.data == "test_mode":
-                await self.toggle_test_mode(query)
-            elif query.data == "reset":
-                await self.show_reset_confirmation(query)
-            elif query.data.startswith("reset_confirm_"):
-                user_id_to_reset = int(query.data.split("_")[-1])
-                if user_id == user_id_to_reset:
-                    # Reset user data
-                    self.update_user_session(user_id, purchased_count=0)
-                    session = self.get_user_session(user_id)
-                    session['processed_skins'].clear()
-                    
-                    # Clear processed skins from database
-                    cursor = self.conn.cursor()
-                    cursor.execute("DELETE FROM processed_skins WHERE user_id = ?", (user_id,))
-                    self.conn.commit()
-                    
-                    await query.edit_message_text("✅ Your data has been reset! You can now find 10 more opportunities.", parse_mode='Markdown')
+            handler = self.callback_handlers.get(query.data)
+            if handler:
+                await handler(query)
+            elif query.data in self.context_callback_handlers:
+                await self.context_callback_handlers[query.data](query, context)
+            elif query.data == "reset_confirm" or query.data == f"reset_confirm_{user_id}":
+                # The confirming user is always the one reset; the suffixed form is kept for older messages
+                await self.reset_user_progress(user_id)
+                
+                await query.edit_message_text("✅ Your data has been reset! You can now find 10 more opportunities.", parse_mode='Markdown')
             elif query.data == "reset_cancel":
                 await query.edit_message_text("❌ Reset cancelled.")
-            elif query.data == "back_main":
-                await self.show_main_menu_inline(query)
             else:
                 await query.edit_message_text("❌ Unknown command. Use /start to return to main menu.")
         except Exception as e:
             logger.error(f"Error in button callback: {e}")
             await query.edit_message_text("❌ Something went wrong. Use /start to return to main menu.")
     
+    async def show_status_inline(self, query):
+        """Show status inline"""
+        status_text = await self.render_status(query.from_user.id)
+        
+        await query.edit_message_text(status_text, parse_mode='Markdown', reply_markup=self.back_main_markup)
+    
+    async def show_purchases_inline(self, query):
+        """Show purchases inline"""
+        text = await self.render_purchases(query.from_user.id)
+        
+        await query.edit_message_text(text, parse_mode='Markdown', reply_markup=self.back_main_markup)
+    
     async def show_settoken_inline(self, query, context):
         """Show settoken inline"""
         context.user_data['waiting_for_token'] = True
         
-        text = """🔑 *Set Your Steam Session Token*
-
-**How to get your token:**
-1. Login to Steam in your browser
-2. Open Developer Tools (F12)
-3. Go to Application → Cookies → steamcommunity.com
-4. Find 'sessionid' cookie and copy its value
-
-**Now send me your token** (it will be stored securely):
-
-⚠️ *Make sure you're in a private chat - don't share tokens in groups!*"""
-        
-        keyboard = [[InlineKeyboardButton("🔙 Back to Main", callback_data="back_main")]]
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        
-        await query.edit_message_text(text, parse_mode='Markdown', reply_markup=reply_markup)
+        await query.edit_message_text(SET_TOKEN_INLINE_TEXT, parse_mode='Markdown', reply_markup=self.back_main_markup)
     
     async def show_settings_menu(self, query):
         """Show settings menu"""
         user_id = query.from_user.id
         session = self.get_user_session(user_id)
         
-        auto_status = "✅ ENABLED" if session['auto_purchase'] else "❌ DISABLED"
-        max_price = session['max_price_cents'] / 100
+        auto_status = "✅ ENABLED" if session.auto_purchase else "❌ DISABLED"
+        max_price = session.max_price_cents / 100
         
         keyboard = [
             [InlineKeyboardButton(f"🤖 Auto Purchase: {auto_status}", callback_data="toggle_auto_purchase")],
@@ -516,7 +1068,7 @@ Enable to scan without purchasing - perfect for testing!"""
         reply_markup = InlineKeyboardMarkup(keyboard)
         
         # Prepare variables to avoid backslashes in f-strings
-        auto_text = '   • Items will be purchased automatically' if session['auto_purchase'] else '   • You will only get notifications'
+        auto_text = '   • Items will be purchased automatically' if session.auto_purchase else '   • You will only get notifications'
         
         settings_text = f"""⚙️ *Your Bot Settings*
 
@@ -526,9 +1078,9 @@ Enable to scan without purchasing - perfect for testing!"""
 💰 **Max Price**: ${max_price:.2f}
    • Won't buy items above this price
 
-🎯 **Purchase Limit**: {session['max_purchases']} opportunities  
+🎯 **Purchase Limit**: {session.max_purchases} opportunities  
 ⏰ **Check Interval**: 30 seconds
-📅 **Max Item Age**: {session.get('max_item_age_days', 7)} days
+📅 **Max Item Age**: {session.max_item_age_days} days
 🎨 **Target**: First-time creators only
 
 **How Auto Purchase Works:**
@@ -546,7 +1098,7 @@ Enable to scan without purchasing - perfect for testing!"""
         user_id = query.from_user.id
         session = self.get_user_session(user_id)
         
-        new_setting = not session['auto_purchase']
+        new_setting = not session.auto_purchase
         self.update_user_session(user_id, auto_purchase=new_setting)
         
         # Show updated settings menu
@@ -554,45 +1106,7 @@ Enable to scan without purchasing - perfect for testing!"""
     
     async def show_help_inline(self, query):
         """Show help inline"""
-        help_text = """🤖 *Rust Skin Auto-Purchase Bot - Help*
-
-**🎯 Main Commands:**
-/start - Show main menu and status
-/monitor - Start monitoring and auto-purchasing
-/stop - Stop monitoring
-/status - Check your current status
-/purchases - View your purchase history
-/settoken - Set your Steam session token
-/reset - Reset your purchase counter
-/help - Show this help message
-
-**🔧 How Auto-Purchase Works:**
-1. I monitor the SCMM API every 30 seconds
-2. I look for items from creators with only 1 accepted item
-3. I only consider items that are 7 days old or newer
-4. If auto-purchase is enabled AND price ≤ your max price
-5. I automatically place a buy order on Steam Market
-6. You get notified of success/failure immediately
-7. I track up to 10 purchases per user
-
-**🧪 Test Mode:**
-• Enable test mode to scan without spending money
-• **SIMULATES purchases** with fake success/failure results
-• Perfect for testing the bot logic before going live
-• Shows detailed analysis of what would be purchased
-• No Steam token required in test mode
-
-**⚙️ Settings You Can Control:**
-• **Auto Purchase**: Enable/disable automatic buying
-• **Max Price**: Set maximum price per item ($0.50 - $500)
-• **Steam Token**: Your session for making purchases
-
-Need more help? Check the GitHub repository or contact support!"""
-
-        keyboard = [[InlineKeyboardButton("🔙 Back to Main", callback_data="back_main")]]
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        
-        await query.edit_message_text(help_text, parse_mode='Markdown', reply_markup=reply_markup)
+        await query.edit_message_text(HELP_INLINE_TEXT, parse_mode='Markdown', reply_markup=self.back_main_markup)
     
     async def start_monitoring_inline(self, query):
         """Start monitoring inline"""
@@ -600,122 +1114,65 @@ Need more help? Check the GitHub repository or contact support!"""
         session = self.get_user_session(user_id)
         
         # In test mode, we don't need Steam token
-        if not session.get('test_mode', False) and not session['steam_session_token']:
+        if not session.test_mode and not session.steam_session_token:
             text = "❌ Please set your Steam token first using the 🔑 Set Steam Token button\n\n(Or enable 🧪 Test Mode to scan without purchasing)"
-            keyboard = [[InlineKeyboardButton("🔙 Back to Main", callback_data="back_main")]]
-            reply_markup = InlineKeyboardMarkup(keyboard)
-            await query.edit_message_text(text, reply_markup=reply_markup)
+            await query.edit_message_text(text, reply_markup=self.back_main_markup)
             return
         
-        if session['is_monitoring']:
+        if session.is_monitoring:
             text = "⚠️ You're already monitoring! Use ⏹️ Stop Monitoring to stop."
-            keyboard = [[InlineKeyboardButton("🔙 Back to Main", callback_data="back_main")]]
-            reply_markup = InlineKeyboardMarkup(keyboard)
-            await query.edit_message_text(text, reply_markup=reply_markup)
+            await query.edit_message_text(text, reply_markup=self.back_main_markup)
             return
         
-        if session['purchased_count'] >= session['max_purchases']:
-            text = f"🛑 You've already found {session['max_purchases']} opportunities!\n\nUse /reset to reset your counter and start monitoring again."
-            keyboard = [[InlineKeyboardButton("🔙 Back to Main", callback_data="back_main")]]
-            reply_markup = InlineKeyboardMarkup(keyboard)
-            await query.edit_message_text(text, reply_markup=reply_markup)
+        if session.purchased_count >= session.max_purchases:
+            text = f"🛑 You've already found {session.max_purchases} opportunities!\n\nUse /reset to reset your counter and start monitoring again."
+            await query.edit_message_text(text, reply_markup=self.back_main_markup)
             return
         
         # Start monitoring
-        self.update_user_session(user_id, is_monitoring=True)
+        self.start_monitoring(user_id)
         
-        # Start monitoring task
-        task = asyncio.create_task(self.monitor_user_skins(user_id))
-        self.monitoring_tasks[user_id] = task
-        
-        mode_text = "🧪 TEST MODE" if session.get('test_mode', False) else "💰 LIVE MODE"
-        action_text = "scanning and reporting" if session.get('test_mode', False) else "scanning and purchasing"
+        mode_text = "🧪 TEST MODE" if session.test_mode else "💰 LIVE MODE"
+        action_text = "scanning and reporting" if session.test_mode else "scanning and purchasing"
         
         # Prepare variables to avoid backslashes in f-strings
-        result_text = "I'll report what I find without making purchases!" if session.get('test_mode', False) else "I'll send you alerts when I find and purchase opportunities!"
+        result_text = "I'll report what I find without making purchases!" if session.test_mode else "I'll send you alerts when I find and purchase opportunities!"
         
         text = f"""🚀 *Monitoring started in {mode_text}!*
 
 I'm now {action_text} first-time creator items.
-Progress: {session['purchased_count']}/{session['max_purchases']}
+Progress: {session.purchased_count}/{session.max_purchases}
 
 {result_text}
 Use ⏹️ Stop Monitoring to stop anytime."""
         
-        keyboard = [[InlineKeyboardButton("🔙 Back to Main", callback_data="back_main")]]
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        
-        await query.edit_message_text(text, parse_mode='Markdown', reply_markup=reply_markup)
+        await query.edit_message_text(text, parse_mode='Markdown', reply_markup=self.back_main_markup)
     
     async def stop_monitoring_inline(self, query):
         """Stop monitoring inline"""
         user_id = query.from_user.id
         session = self.get_user_session(user_id)
         
-        if not session['is_monitoring']:
+        if not session.is_monitoring:
             text = "⚠️ You're not currently monitoring."
-            keyboard = [[InlineKeyboardButton("🔙 Back to Main", callback_data="back_main")]]
-            reply_markup = InlineKeyboardMarkup(keyboard)
-            await query.edit_message_text(text, reply_markup=reply_markup)
-            return
-        
-        # Stop monitoring
-        self.update_user_session(user_id, is_monitoring=False)
-        
-        # Cancel monitoring task
-        if user_id in self.monitoring_tasks:
-            self.monitoring_tasks[user_id].cancel()
-            del self.monitoring_tasks[user_id]
-        
-        text = "⏹️ *Monitoring stopped.*\n\nUse ▶️ Start Monitoring to start monitoring again anytime!"
-        keyboard = [[InlineKeyboardButton("🔙 Back to Main", callback_data="back_main")]]
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        
-        await query.edit_message_text(text, parse_mode='Markdown', reply_markup=reply_markup)
-    
-    async def show_reset_confirmation(self, query):
-        """Show reset confirmation"""
-        user_id = query.from_user.id
-        
-        keyboard = [
-            [InlineKeyboardButton("✅ Yes, Reset Everything", callback_data=f"reset_confirm_{user_id}")],
-            [InlineKeyboardButton("❌ Cancel", callback_data="reset_cancel")],
-            [InlineKeyboardButton("🔙 Back to Settings", callback_data="settings")]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        
-        text = """⚠️ *Reset Your Data*
-
-This will reset:
-• Your opportunity counter to 0
-• Your processed items list
-• Allow you to find 10 more opportunities
-
-Your Steam token and purchase history will be kept.
-
-Are you sure?"""
+            await query.edit_message_text(text, reply_markup=self.back_main_markup)
+            return
+        
+        # Stop monitoring
+        self.stop_monitoring(user_id)
         
-        await query.edit_message_text(text, parse_mode='Markdown', reply_markup=reply_markup)
+        text = "⏹️ *Monitoring stopped.*\n\nUse ▶️ Start Monitoring to start monitoring again anytime!"
+        await query.edit_message_text(text, parse_mode='Markdown', reply_markup=self.back_main_markup)
+    
+    async def show_reset_confirmation(self, query):
+        """Show reset confirmation"""
+        await query.edit_message_text(RESET_CONFIRM_TEXT, parse_mode='Markdown', reply_markup=self.reset_confirm_markup)
     
     async def set_max_price_prompt(self, query, context):
         """Prompt user to set max price"""
         context.user_data['waiting_for_max_price'] = True
         
-        text = """💰 *Set Maximum Purchase Price*
-
-Send me the maximum price you want to spend per item (in USD).
-
-**Examples:**
-• `5` = $5.00
-• `10.50` = $10.50
-• `25` = $25.00
-
-*Send your max price now:*"""
-        
-        keyboard = [[InlineKeyboardButton("🔙 Back to Settings", callback_data="settings")]]
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        
-        await query.edit_message_text(text, parse_mode='Markdown', reply_markup=reply_markup)
+        await query.edit_message_text(MAX_PRICE_PROMPT_TEXT, parse_mode='Markdown', reply_markup=self.back_settings_markup)
     
     async def handle_message(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle text messages"""
@@ -767,240 +1224,354 @@ Send me the maximum price you want to spend per item (in USD).
                     "Please send a number like: 5, 10.50, or 25"
                 )
     
-    async def monitor_user_skins(self, user_id: int):
-        """Main monitoring loop for a specific user"""
-        session = self.get_user_session(user_id)
+    def start_monitoring(self, user_id: int):
+        """Mark a user as monitoring and wake the feed poller so their first scan runs right away"""
+        self.update_user_session(user_id, is_monitoring=True)
+        self.monitoring_users.add(user_id)
+        self.ensure_poller()
+        self._feed_wake.set()
         logger.info(f"Starting skin monitoring for user {user_id}")
-        
-        try:
-            while session['is_monitoring'] and session['purchased_count'] < session['max_purchases']:
-                await self.check_new_skins_for_user(user_id)
-                await asyncio.sleep(30)
-        except asyncio.CancelledError:
-            logger.info(f"Monitoring cancelled for user {user_id}")
-        except Exception as e:
-            logger.error(f"Error in monitoring loop for user {user_id}: {e}")
-            await self.send_user_message(user_id, f"❌ Monitoring error: {str(e)}\nTry restarting with /monitor")
-        finally:
-            self.update_user_session(user_id, is_monitoring=False)
-            if user_id in self.monitoring_tasks:
-                del self.monitoring_tasks[user_id]
-        
-        if session['purchased_count'] >= session['max_purchases']:
-            await self.send_user_message(
-                user_id, 
-                f"🎉 Found {session['max_purchases']} opportunities! "
-                f"Monitoring stopped. Use /reset to find more!"
-            )
-        
+    
+    def stop_monitoring(self, user_id: int):
+        """Take a user out of the feed poller's rotation"""
+        self.update_user_session(user_id, is_monitoring=False)
+        self.monitoring_users.discard(user_id)
+        if not self.monitoring_users:
+            # Lets an idle poller see the empty set and exit instead of sleeping out the interval
+            self._feed_wake.set()
         logger.info(f"Skin monitoring stopped for user {user_id}")
     
-    async def check_new_skins_for_user(self, user_id: int):
-        """Check for new skins for a specific user"""
+    def resume_monitoring(self):
+        """Load sessions that were monitoring when the bot last stopped so polling carries on"""
+        # Every resumed session is hydrated by the same single statement rather than one lookup per user
+        rows = self.conn.execute(
+            SELECT_SESSIONS_SQL + "WHERE us.is_monitoring", (PROCESSED_SKINS_LIMIT,)
+        ).fetchall()
+        for row in rows:
+            user_id = row['user_id']
+            if user_id not in self.user_sessions:
+                self.user_sessions[user_id] = self.session_from_row(row)
+            self.monitoring_users.add(user_id)
+        if rows:
+            self.ensure_poller()
+            logger.info(f"Resumed monitoring for {len(rows)} users")
+    
+    def ensure_poller(self):
+        """Start the feed poller unless it is already running"""
+        if self.poller_task is None or self.poller_task.done():
+            self.poller_task = asyncio.create_task(self.poll_feed())
+    
+    async def poll_feed(self):
+        """Fetch the feed once per interval and fan it out to every monitoring user, until none are left"""
+        cycle = 0
+        while self.monitoring_users:
+            # Cleared before the snapshot so a user who starts monitoring mid-cycle still triggers the next one
+            self._feed_wake.clear()
+            try:
+                user_ids = list(self.monitoring_users)
+                items = await self.fetch_latest_items()
+                if items is not None:
+                    # Users whose watermark is already the page head have nothing new on it
+                    feed_head = str(items[0].get('id', '')) if items else None
+                    pending = [user_id for user_id in user_ids if self.user_sessions[user_id].feed_head != feed_head]
+                    if pending:
+                        try:
+                            await asyncio.gather(*(self.check_new_skins_for_user(user_id, items) for user_id in pending))
+                        finally:
+                            self.flush_processed_skins()
+                
+                cycle += 1
+                if cycle % PROCESSED_PRUNE_EVERY_CYCLES == 0:
+                    for user_id in user_ids:
+                        self.prune_processed_skins(user_id, self.user_sessions[user_id].max_item_age_days)
+            except Exception as e:
+                logger.error(f"Error in feed poller: {e}")
+            
+            try:
+                await asyncio.wait_for(
+                    self._feed_wake.wait(),
+                    timeout=FEED_POLL_INTERVAL + random.uniform(-FEED_POLL_JITTER, FEED_POLL_JITTER)
+                )
+            except asyncio.TimeoutError:
+                pass
+        
+        logger.info("No users monitoring - feed poller stopped")
+    
+    async def check_new_skins_for_user(self, user_id: int, items: List[Dict]):
+        """Check the latest feed page for new skins for a specific user"""
         session = self.get_user_session(user_id)
         
         try:
-            item_response = requests.get(
-                f"{self.api_base}/item", 
-                params={
-                    'sortBy': 'timeCreated', 
-                    'sortByOrder': 'desc',
-                    'count': 50
-                }, 
-                timeout=10
-            )
-            
-            if item_response.status_code == 200:
-                item_data = item_response.json()
-                items = item_data.get('items', [])
+            if session.purchased_count < session.max_purchases:
+                new_rows, candidates = await self.select_candidates(user_id, session, items)
                 
-                new_items_count = 0
-                for item in items:
-                    item_id = str(item.get('id', ''))
-                    if item_id and item_id not in session['processed_skins']:
-                        session['processed_skins'].add(item_id)
-                        
-                        cursor = self.conn.cursor()
-                        cursor.execute('''
-                            INSERT OR IGNORE INTO processed_skins (user_id, skin_id) 
-                            VALUES (?, ?)
-                        ''', (user_id, item_id))
-                        self.conn.commit()
-                        
-                        await self.process_item_for_user(user_id, item)
-                        new_items_count += 1
-                        
-                        if session['purchased_count'] >= session['max_purchases']:
-                            break
+                # Buffered so every user's rows from this poll are written as one job
+                self.processed_buffer.extend(new_rows)
+                
+                # Second pass: full processing (creator lookup, alerting) for survivors only, with
+                # the creator checks running concurrently; record_opportunity_for_user enforces the cap
+                await asyncio.gather(
+                    *(self.process_item_for_user(user_id, item, item_timestamp) for item, item_timestamp in candidates),
+                    return_exceptions=True
+                )
                 
-                if new_items_count > 0:
-                    logger.info(f"Processed {new_items_count} new items for user {user_id}")
+                if new_rows:
+                    logger.info(f"Processed {len(new_rows)} new items for user {user_id}")
                 
         except Exception as e:
             logger.error(f"Error checking new skins for user {user_id}: {e}")
+        
+        if session.is_monitoring and session.purchased_count >= session.max_purchases:
+            self.stop_monitoring(user_id)
+            await self.send_user_message(
+                user_id, 
+                f"🎉 Found {session.max_purchases} opportunities\\! "
+                f"Monitoring stopped\\. Use /reset to find more\\!"
+            )
     
-    async def process_item_for_user(self, user_id: int, item_data: Dict):
-        """Process a single item for a specific user"""
-        try:
-            session = self.get_user_session(user_id)
+    async def select_candidates(self, user_id: int, session: UserSession, items: List[Dict]) -> Tuple[List[Tuple], List[Tuple[Dict, int]]]:
+        """Mark unseen feed items processed; return rows to persist and (item, timestamp) candidates"""
+        max_age_days = session.max_item_age_days
+        new_rows = []
+        candidates = []
+        
+        # The feed is newest first, so everything from last poll's first item onward was already seen
+        feed_head = session.feed_head
+        page = []
+        for item in items:
+            item_id = str(item.get('id', ''))
+            if not item_id:
+                continue
+            if item_id == feed_head:
+                break
+            page.append((item_id, item))
+        
+        seen = await self.processed_skin_ids(user_id, session, [item_id for item_id, _ in page])
+        for item_id, item in page:
+            if item_id in seen:
+                continue
             
-            creator_id = item_data.get('creatorId')
-            creator_name = item_data.get('creatorName', 'Unknown Creator')
-            item_name = item_data.get('name', 'Unknown Item')
-            item_type = item_data.get('itemType', 'Unknown Type')
-            item_collection = item_data.get('itemCollection', 'Unknown Collection')
-            is_accepted = item_data.get('isAccepted', False)
-            workshop_file_id = item_data.get('workshopFileId')
+            seen.add(item_id)
+            session.processed_skins.add(item_id)
+            new_rows.append((user_id, item_id))
+            
+            if not item.get('isAccepted', False):
+                continue
+            item_timestamp = self.is_recent_item(item.get('timeAccepted'), item.get('timeCreated'), max_age_days)
+            if item_timestamp is None:
+                continue
+            candidates.append((item, item_timestamp))
+        
+        # Moved only once the page is diffed, so a failed lookup leaves these items for the next poll
+        if items:
+            session.feed_head = str(items[0].get('id', ''))
+        
+        return new_rows, candidates
+    
+    async def fetch_latest_items(self) -> Optional[List[Dict]]:
+        """Fetch the newest SCMM items, sharing one request between all monitoring users"""
+        async with self._feed_lock:
+            # Users polling within the same window reuse the page fetched by the first one
+            if time.monotonic() - self._feed_fetched_at < FEED_CACHE_TTL:
+                return self._feed_items
+            
+            item_response = await self.scmm_get(
+                "/item", 
+                params={
+                    'sortBy': 'timeCreated', 
+                    'sortByOrder': 'desc',
+                    'count': FEED_PAGE_SIZE
+                },
+                headers=self._feed_validators
+            )
             
-            time_accepted = item_data.get('timeAccepted')
-            time_created = item_data.get('timeCreated')
+            # Unchanged since the last fetch - no body to download or parse
+            if item_response.status_code == 304:
+                self._feed_fetched_at = time.monotonic()
+                return self._feed_items
             
-            if not is_accepted:
-                return
+            if item_response.status_code != 200:
+                logger.warning(f"SCMM feed request failed with status {item_response.status_code}")
+                return None
             
-            if not self.is_recent_item(time_accepted, time_created, session['max_item_age_days']):
-                return
+            self._feed_items = json_loads(item_response.content).get('items', [])
+            self._feed_fetched_at = time.monotonic()
             
+            self._feed_validators = {}
+            if 'ETag' in item_response.headers:
+                self._feed_validators['If-None-Match'] = item_response.headers['ETag']
+            if 'Last-Modified' in item_response.headers:
+                self._feed_validators['If-Modified-Since'] = item_response.headers['Last-Modified']
+            return self._feed_items
+    
+    async def processed_skin_ids(self, user_id: int, session: UserSession, item_ids: List[str]) -> Set[str]:
+        """Return which of item_ids were already processed - the in-memory LRU first, then SQLite for the rest"""
+        seen = {item_id for item_id in item_ids if item_id in session.processed_skins}
+        misses = list(dict.fromkeys(item_id for item_id in item_ids if item_id not in seen))
+        if not misses:
+            return seen
+        
+        # Everything the LRU has evicted is checked with one IN query on the reader pool, not one probe per item
+        rows = await self._db_read(_processed_skins_in_sql(len(misses)), (user_id, *misses))
+        for (item_id,) in rows:
+            seen.add(item_id)
+            session.processed_skins.add(item_id)
+        return seen
+    
+    def prune_processed_skins(self, user_id: int, max_age_days: int):
+        """Drop processed-skin rows too old to ever pass the item age filter again"""
+        self._db_write((PRUNE_PROCESSED_SKINS_SQL, (user_id, f'-{max_age_days * 2} days')))
+    
+    async def process_item_for_user(self, user_id: int, item_data: Dict, item_timestamp: Optional[int] = None):
+        """Process a single accepted, recent item for a specific user"""
+        try:
+            # Most items come from creators we already know - reject those before unpacking anything else
+            creator_id = item_data.get('creatorId')
             if not creator_id:
                 return
+            creator_id = _creator_key(creator_id)
+            if creator_id in self.known_creators:
+                return
+            
+            g = item_data.get
+            creator_name = g('creatorName', 'Unknown Creator')
+            item_name = g('name', 'Unknown Item')
+            item_type = g('itemType', 'Unknown Type')
+            item_collection = g('itemCollection', 'Unknown Collection')
+            workshop_file_id = g('workshopFileId')
             
             if await self.is_first_time_creator(creator_id, creator_name):
                 logger.info(f"User {user_id}: Found first-time creator {creator_name} with RECENT item {item_name}")
                 await self.record_opportunity_for_user(
                     user_id, item_data, creator_id, creator_name, item_name, 
-                    item_type, item_collection, workshop_file_id
+                    item_type, item_collection, workshop_file_id, item_timestamp
                 )
                 
         except Exception as e:
             logger.error(f"Error processing item for user {user_id}: {e}")
     
-    def is_recent_item(self, time_accepted: str, time_created: str, max_age_days: int = 7) -> bool:
-        """Check if item was accepted/created within the specified number of days"""
+    def is_recent_item(self, time_accepted: str, time_created: str, max_age_days: int = 7) -> Optional[int]:
+        """Return the item's accepted/created time as unix seconds if within the age limit, else None"""
         try:
             time_str = time_accepted or time_created
             
             if not time_str:
                 logger.warning("No timestamp found for item - skipping")
-                return False
-            
-            if time_str.endswith('Z'):
-                item_time = datetime.fromisoformat(time_str.replace('Z', '+00:00'))
-            else:
-                item_time = datetime.fromisoformat(time_str)
-            
-            item_time = item_time.replace(tzinfo=None)
-            current_time = datetime.utcnow()
+                return None
             
-            age_limit = timedelta(days=max_age_days)
-            item_age = current_time - item_time
+            item_time = datetime.fromisoformat(time_str.replace('Z', '+00:00'))
+            if item_time.tzinfo is None:
+                item_time = item_time.replace(tzinfo=timezone.utc)
+            item_timestamp = int(item_time.timestamp())
             
-            is_recent = item_age <= age_limit
+            item_age_days = (time.time() - item_timestamp) / 86400
             
-            if not is_recent:
-                logger.debug(f"Item too old: {item_age.days} days old (limit: {max_age_days} days)")
-            else:
-                logger.debug(f"Item is recent: {item_age.days} days old (within {max_age_days} day limit)")
+            if item_age_days > max_age_days:
+                logger.debug(f"Item too old: {int(item_age_days)} days old (limit: {max_age_days} days)")
+                return None
             
-            return is_recent
+            logger.debug(f"Item is recent: {int(item_age_days)} days old (within {max_age_days} day limit)")
+            return item_timestamp
             
         except Exception as e:
             logger.error(f"Error checking item age: {e}")
-            return False
+            return None
     
     async def record_opportunity_for_user(self, user_id: int, item_data: Dict, creator_id: int, 
                                         creator_name: str, item_name: str, item_type: str, 
-                                        item_collection: str, workshop_file_id: int):
+                                        item_collection: str, workshop_file_id: int,
+                                        item_timestamp: Optional[int] = None):
         """Record a purchase opportunity and attempt automatic purchase (or show test info)"""
         session = self.get_user_session(user_id)
         
-        self.add_creator_to_db(str(creator_id), creator_name)
-        
-        session['purchased_count'] += 1
-        self.update_user_session(user_id, purchased_count=session['purchased_count'])
+        # Items are processed concurrently, so the cap and the creator are claimed here, with no
+        # await between the check and the update
+        if session.purchased_count >= session.max_purchases or creator_id in self.known_creators:
+            return
         
-        item_id = item_data.get('id')
-        market_id = item_data.get('marketId')
+        # Update in-memory state right away; the database rows are written together below
+        self.known_creators[creator_id] = True
+        self.creator_verdicts.pop(creator_id, None)
+        session.purchased_count += 1
         
-        if market_id:
-            steam_url = f"https://steamcommunity.com/market/listings/252490/{market_id}"
-        else:
-            steam_name = item_name.replace(' ', '%20').replace('|', '%7C')
-            steam_url = f"https://steamcommunity.com/market/listings/252490/{steam_name}"
+        g = item_data.get
+        item_id = g('id')
+        market_id = g('marketId')
+        workshop_url = g('workshopFileUrl', '')
+        market_price = g('marketSellOrderLowestPrice', 0)
+        buy_orders = g('marketBuyOrderCount', 0)
+        sell_orders = g('marketSellOrderCount', 0)
         
+        steam_url = STEAM_LISTING_URL + (str(market_id) if market_id else quote(item_name, safe=''))
         scmm_url = f"https://rust.scmm.app/item/{item_id}" if item_id else "https://rust.scmm.app"
-        workshop_url = item_data.get('workshopFileUrl', '')
-        
-        market_price = item_data.get('marketSellOrderLowestPrice', 0)
-        buy_orders = item_data.get('marketBuyOrderCount', 0)
-        sell_orders = item_data.get('marketSellOrderCount', 0)
         
-        time_accepted = item_data.get('timeAccepted')
-        time_created = item_data.get('timeCreated')
-        item_age = self.calculate_item_age(time_accepted, time_created)
+        item_age = self.calculate_item_age(item_timestamp)
         
-        # Prepare variables to avoid backslashes in f-strings
-        budget_check = '✅ Would purchase (within budget)' if market_price <= session.get('max_price_cents', 1000) else '❌ Would skip (over budget)'
-        auto_purchase_check = '✅ Auto-purchase enabled' if session.get('auto_purchase', True) else '❌ Auto-purchase disabled'
+        # Pre-escape every dynamic fragment once for MarkdownV2
+        max_price_cents = session.max_price_cents
+        max_age_days = session.max_item_age_days
+        price_text = _md_escape(f"${market_price/100:.2f}")
+        max_price_text = _md_escape(f"${max_price_cents/100:.2f}")
+        age_text = _md_escape(item_age)
         
-        would_purchase = 'purchased' if (session.get('auto_purchase', True) and market_price <= session.get('max_price_cents', 1000)) else 'skipped'
+        budget_check = '✅ Would purchase \\(within budget\\)' if market_price <= max_price_cents else '❌ Would skip \\(over budget\\)'
+        auto_purchase_check = '✅ Auto\\-purchase enabled' if session.auto_purchase else '❌ Auto\\-purchase disabled'
         
-        if session.get('test_mode', False):
-            import random
-            
+        if session.test_mode:
             # Simulate purchase attempt in test mode for testing bot logic
-            would_attempt_purchase = (session.get('auto_purchase', True) and 
+            would_attempt_purchase = (session.auto_purchase and 
                                     market_price > 0 and 
-                                    market_price <= session.get('max_price_cents', 1000))
+                                    market_price <= max_price_cents)
             
             if would_attempt_purchase:
                 # 70% success rate for fake purchases to simulate realistic conditions
                 purchase_success = random.random() < 0.7
                 if purchase_success:
-                    purchase_details = f"""🧪 **TEST MODE - SIMULATED SUCCESSFUL PURCHASE**
+                    purchase_details = rf"""🧪 *TEST MODE \- SIMULATED SUCCESSFUL PURCHASE*
 
-✅ **Fake Purchase Details:**
-💰 Price: ${market_price/100:.2f} (simulated payment)
-🎯 Status: ✅ Successfully "purchased" (fake)
+✅ *Fake Purchase Details:*
+💰 Price: {price_text} \(simulated payment\)
+🎯 Status: ✅ Successfully "purchased" \(fake\)
 ⚡ Method: Test mode simulation
 
-📊 **Analysis Results:**
-✅ Creator has ≤1 accepted items (first-time!)
-✅ Item age: {item_age} (within {session.get('max_item_age_days', 7)} day limit)
-✅ Price within budget: ${market_price/100:.2f} ≤ ${session.get('max_price_cents', 1000)/100:.2f}
-✅ Auto-purchase enabled
+📊 *Analysis Results:*
+✅ Creator has ≤1 accepted items \(first\-time\!\)
+✅ Item age: {age_text} \(within {max_age_days} day limit\)
+✅ Price within budget: {price_text} ≤ {max_price_text}
+✅ Auto\-purchase enabled
 
-🧪 **This WOULD be a real purchase in live mode!**
+🧪 *This WOULD be a real purchase in live mode\!*
 
 """
                 else:
-                    purchase_details = f"""🧪 **TEST MODE - SIMULATED FAILED PURCHASE**
+                    purchase_details = rf"""🧪 *TEST MODE \- SIMULATED FAILED PURCHASE*
 
-❌ **Fake Purchase Details:** 
-💰 Price: ${market_price/100:.2f} (would have been paid)
-🎯 Status: ❌ "Purchase failed" (simulated error)
-⚡ Error: Random test failure (item sold out, network error, etc.)
+❌ *Fake Purchase Details:* 
+💰 Price: {price_text} \(would have been paid\)
+🎯 Status: ❌ "Purchase failed" \(simulated error\)
+⚡ Error: Random test failure \(item sold out, network error, etc\.\)
 
-📊 **Analysis Results:**
-✅ Creator has ≤1 accepted items (first-time!)
-✅ Item age: {item_age} (within {session.get('max_item_age_days', 7)} day limit)
-✅ Price within budget: ${market_price/100:.2f} ≤ ${session.get('max_price_cents', 1000)/100:.2f}
-✅ Auto-purchase enabled
+📊 *Analysis Results:*
+✅ Creator has ≤1 accepted items \(first\-time\!\)
+✅ Item age: {age_text} \(within {max_age_days} day limit\)
+✅ Price within budget: {price_text} ≤ {max_price_text}
+✅ Auto\-purchase enabled
 
-🧪 **This shows how failed purchases are handled!**
+🧪 *This shows how failed purchases are handled\!*
 
 """
             else:
                 purchase_success = False
-                purchase_details = f"""🧪 **TEST MODE - WOULD NOT PURCHASE**
+                purchase_details = rf"""🧪 *TEST MODE \- WOULD NOT PURCHASE*
 
-📊 **Analysis Results:**
-✅ Creator has ≤1 accepted items (first-time!)
-✅ Item age: {item_age} (within {session.get('max_item_age_days', 7)} day limit)
-💰 Market price: ${market_price/100:.2f} vs your max ${session.get('max_price_cents', 1000)/100:.2f}
+📊 *Analysis Results:*
+✅ Creator has ≤1 accepted items \(first\-time\!\)
+✅ Item age: {age_text} \(within {max_age_days} day limit\)
+💰 Market price: {price_text} vs your max {max_price_text}
 {budget_check}
 {auto_purchase_check}
 
-🎯 **This item would be SKIPPED in live mode**
+🎯 *This item would be SKIPPED in live mode*
 
 """
             
@@ -1009,14 +1580,14 @@ Send me the maximum price you want to spend per item (in USD).
             purchase_success = False
             purchase_details = ""
             
-            if (session['auto_purchase'] and 
-                session['steam_session_token'] and 
+            if (session.auto_purchase and 
+                session.steam_session_token and 
                 market_price > 0 and 
-                market_price <= session['max_price_cents']):
+                market_price <= session.max_price_cents):
                 
                 try:
                     purchase_result = await self.attempt_steam_purchase(
-                        session['steam_session_token'], 
+                        session.steam_session_token, 
                         item_name, 
                         market_price,
                         item_data
@@ -1024,112 +1595,119 @@ Send me the maximum price you want to spend per item (in USD).
                     
                     if purchase_result['success']:
                         purchase_success = True
-                        purchase_details = f"✅ **PURCHASED SUCCESSFULLY!**\n💰 **Price**: ${purchase_result['price']:.2f}\n"
+                        paid_text = _md_escape(f"${purchase_result['price']:.2f}")
+                        purchase_details = f"✅ *PURCHASED SUCCESSFULLY\\!*\n💰 *Price*: {paid_text}\n"
                     else:
-                        purchase_details = f"❌ **Purchase Failed**: {purchase_result['error']}\n"
+                        purchase_details = f"❌ *Purchase Failed*: {_md_escape(purchase_result['error'])}\n"
                         
                 except Exception as e:
-                    purchase_details = f"❌ **Purchase Error**: {str(e)}\n"
+                    purchase_details = f"❌ *Purchase Error*: {_md_escape(str(e))}\n"
                     logger.error(f"Purchase error for user {user_id}: {e}")
             
-            elif session['auto_purchase'] and market_price > session['max_price_cents']:
-                purchase_details = f"⚠️ **Price too high**: ${market_price/100:.2f} > ${session['max_price_cents']/100:.2f} (your max)\n"
+            elif session.auto_purchase and market_price > session.max_price_cents:
+                purchase_details = f"⚠️ *Price too high*: {price_text} \\> {max_price_text} \\(your max\\)\n"
             
-            elif not session['auto_purchase']:
-                purchase_details = f"ℹ️ **Auto-purchase disabled** - Manual purchase needed\n"
+            elif not session.auto_purchase:
+                purchase_details = "ℹ️ *Auto\\-purchase disabled* \\- Manual purchase needed\n"
         
-        # Build message
-        market_info = ""
+        # Build message - optional lines are collected and joined once
+        market_lines = []
         if market_price > 0:
-            market_info = f"💰 **Market Price**: ${market_price/100:.2f}\n"
+            market_lines.append(f"💰 *Market Price*: {price_text}\n")
         if buy_orders > 0 or sell_orders > 0:
-            market_info += f"📊 **Orders**: {buy_orders} buy, {sell_orders} sell\n"
+            market_lines.append(f"📊 *Orders*: {buy_orders} buy, {sell_orders} sell\n")
+        market_info = "".join(market_lines)
         
-        mode_emoji = "🧪" if session.get('test_mode', False) else ("🎉" if purchase_success else "🎯")
-        mode_text = "TEST SCAN" if session.get('test_mode', False) else ("PURCHASED" if purchase_success else "ALERT")
+        mode_emoji = "🧪" if session.test_mode else ("🎉" if purchase_success else "🎯")
+        mode_text = "TEST SCAN" if session.test_mode else ("PURCHASED" if purchase_success else "ALERT")
         
-        # Prepare final message variables
-        test_mode_active = session.get('test_mode', False)
-        
-        if test_mode_active:
-            final_message_suffix = "🧪 *Test mode active - no purchases made*"
+        if session.test_mode:
+            final_message_suffix = "🧪 _Test mode active \\- no purchases made_"
         elif purchase_success:
-            final_message_suffix = "🎉 *Item purchased automatically! Check your Steam inventory!*"
+            final_message_suffix = "🎉 _Item purchased automatically\\! Check your Steam inventory\\!_"
         else:
-            final_message_suffix = "⚡ *New creator detected - Manual purchase may be needed!*"
-
-        message = f"""{mode_emoji} *FIRST-TIME CREATOR {mode_text}!*
-
-🎨 **Item**: {item_name}
-👤 **Creator**: {creator_name}
-🏷️ **Type**: {item_type}
-📦 **Collection**: {item_collection}
-📅 **Age**: {item_age}
-{market_info}{purchase_details}📈 **Your Progress**: {session['purchased_count']}/{session['max_purchases']}
-
-🔗 **Links**:
-[Steam Market]({steam_url})
-[SCMM Item Page]({scmm_url})"""
-
-        if workshop_url:
-            message += f"\n[Workshop Page]({workshop_url})"
-
-        message += f"\n\n{final_message_suffix}"
+            final_message_suffix = "⚡ _New creator detected \\- Manual purchase may be needed\\!_"
+        
+        workshop_link = f"\n[Workshop Page]({_md_escape_url(workshop_url)})" if workshop_url else ""
+        
+        message = OPPORTUNITY_TEMPLATE.format_map({
+            'mode_emoji': mode_emoji,
+            'mode_text': mode_text,
+            'item_name': _md_escape(item_name),
+            'creator_name': _md_escape(creator_name),
+            'item_type': _md_escape(item_type),
+            'item_collection': _md_escape(item_collection),
+            'item_age': age_text,
+            'market_info': market_info,
+            'purchase_details': purchase_details,
+            'purchased_count': session.purchased_count,
+            'max_purchases': session.max_purchases,
+            'steam_url': _md_escape_url(steam_url),
+            'scmm_url': _md_escape_url(scmm_url),
+            'workshop_link': workshop_link,
+            'final_message_suffix': final_message_suffix,
+        })
         
         await self.send_user_message(user_id, message)
         
-        # Record in database
-        cursor = self.conn.cursor()
-        cursor.execute('''
-            INSERT INTO purchases 
-            (user_id, skin_id, creator_id, creator_name, skin_name, purchase_time, price, success) 
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            user_id,
-            str(item_id),
-            str(creator_id),
-            creator_name,
-            item_name,
-            datetime.now(),
-            market_price / 100 if market_price else 0,
-            purchase_success
-        ))
-        self.conn.commit()
+        # Record creator and opportunity together; the progress counter is flushed periodically
+        self.dirty_sessions.add(user_id)
+        self._db_write(
+            self.creator_row_statement(str(creator_id), creator_name),
+            (INSERT_PURCHASE_SQL, (
+                user_id,
+                str(item_id),
+                str(creator_id),
+                creator_name,
+                item_name,
+                market_price / 100 if market_price else 0,
+                purchase_success
+            ))
+        )
         
-        mode_text = "test scan" if session.get('test_mode', False) else ("purchase" if purchase_success else "opportunity")
+        mode_text = "test scan" if session.test_mode else ("purchase" if purchase_success else "opportunity")
         logger.info(f"Recorded {mode_text} for user {user_id}: {item_name} by {creator_name}")
     
-    def calculate_item_age(self, time_accepted: str, time_created: str) -> str:
-        """Calculate and format item age"""
-        try:
-            time_str = time_accepted or time_created
-            if not time_str:
-                return "Unknown age"
-            
-            if time_str.endswith('Z'):
-                item_time = datetime.fromisoformat(time_str.replace('Z', '+00:00'))
-            else:
-                item_time = datetime.fromisoformat(time_str)
-            
-            item_time = item_time.replace(tzinfo=None)
-            current_time = datetime.utcnow()
-            age_delta = current_time - item_time
-            
-            if age_delta.days > 0:
-                return f"{age_delta.days} days old"
-            elif age_delta.seconds > 3600:
-                hours = age_delta.seconds // 3600
-                return f"{hours} hours old"
-            else:
-                minutes = age_delta.seconds // 60
-                return f"{minutes} minutes old"
-                
-        except Exception:
+    def calculate_item_age(self, item_timestamp: Optional[int]) -> str:
+        """Format item age from its accepted/created unix timestamp"""
+        if item_timestamp is None:
             return "Unknown age"
+        
+        age_seconds = max(0, int(time.time()) - item_timestamp)
+        
+        if age_seconds >= 86400:
+            return f"{age_seconds // 86400} days old"
+        elif age_seconds > 3600:
+            return f"{age_seconds // 3600} hours old"
+        else:
+            return f"{age_seconds // 60} minutes old"
+    
+    def format_timestamp(self, timestamp) -> str:
+        """Format a stored unix timestamp (UTC) for display"""
+        try:
+            if isinstance(timestamp, str):
+                # Legacy ISO string rows that were not migrated
+                timestamp = datetime.fromisoformat(timestamp.replace('Z', '+00:00')).replace(tzinfo=None)
+                return timestamp.strftime("%m/%d %H:%M")
+            if timestamp is None:
+                # time.gmtime(None) would report the current time
+                return "unknown time"
+            # Straight from the epoch int to text - no datetime object per row
+            return time.strftime("%m/%d %H:%M", time.gmtime(timestamp))
+        except (TypeError, ValueError, OverflowError, OSError):
+            return "unknown time"
     
     async def attempt_steam_purchase(self, steam_session_token: str, item_name: str, 
                                    price_cents: int, item_data: Dict) -> Dict:
         """Attempt to purchase item from Steam Community Market using Selenium"""
+        # Launching Chrome is expensive - bail out before doing so if no purchase is possible
+        if not steam_session_token or price_cents <= 0:
+            return {
+                'success': False,
+                'error': 'No Steam token or market price available',
+                'method': 'selenium_purchase'
+            }
+        
         try:
             from selenium import webdriver
             from selenium.webdriver.common.by import By
@@ -1137,21 +1715,16 @@ Send me the maximum price you want to spend per item (in USD).
             from selenium.webdriver.support import expected_conditions as EC
             from selenium.webdriver.chrome.options import Options
             from selenium.webdriver.common.action_chains import ActionChains
-            import time
-            import random
             
             chrome_options = Options()
-            chrome_options.add_argument('--headless')
-            chrome_options.add_argument('--no-sandbox')
-            chrome_options.add_argument('--disable-dev-shm-usage')
-            chrome_options.add_argument('--disable-gpu')
-            chrome_options.add_argument('--window-size=1920,1080')
-            chrome_options.add_argument('--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36')
+            for argument in CHROME_ARGUMENTS:
+                chrome_options.add_argument(argument)
             
             driver = webdriver.Chrome(options=chrome_options)
             
             try:
-                driver.get('https://steamcommunity.com')
+                # Cookies can only be set once the driver is on the domain - a tiny static resource is enough
+                driver.get(STEAM_COOKIE_BOOTSTRAP_URL)
                 
                 driver.add_cookie({
                     'name': 'sessionid',
@@ -1161,7 +1734,7 @@ Send me the maximum price you want to spend per item (in USD).
                 
                 await asyncio.sleep(random.uniform(1.5, 3.0))
                 
-                market_url = f'https://steamcommunity.com/market/listings/252490/{item_name.replace(" ", "%20")}'
+                market_url = STEAM_LISTING_URL + quote(item_name, safe='')
                 driver.get(market_url)
                 
                 wait = WebDriverWait(driver, 15)
@@ -1240,74 +1813,377 @@ Send me the maximum price you want to spend per item (in USD).
                 'method': 'selenium_purchase'
             }
     
-    async def is_first_time_creator(self, creator_id: int, creator_name: str) -> bool:
+    async def scmm_get(self, path: str, params: Optional[Dict] = None, headers: Optional[Dict] = None):
+        """GET an SCMM endpoint within the concurrency limit, backing off on 429/503"""
+        # The feed is fetched once for everyone, so only the global limit applies - no request is made per user
+        for attempt in range(SCMM_MAX_RETRIES + 1):
+            async with self._scmm_sem:
+                response = await self.http.get(path, params=params, headers=headers)
+            
+            if response.status_code not in SCMM_RETRY_STATUSES or attempt == SCMM_MAX_RETRIES:
+                return response
+            
+            retry_after = response.headers.get('Retry-After', '')
+            delay = float(retry_after) if retry_after.isdigit() else SCMM_RETRY_BASE_DELAY * 2 ** attempt
+            logger.warning(f"SCMM returned {response.status_code} for {path}, retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+    
+    async def is_first_time_creator(self, creator_id: Union[int, str], creator_name: str) -> bool:
         """Check if this is a creator's first skin using SCMM profile API"""
-        creator_id_str = str(creator_id)
-        
-        if creator_id_str in self.known_creators:
+        if creator_id in self.known_creators:
+            return False
+        verdict = self.creator_verdicts.get(creator_id)
+        if verdict is not None:
+            return verdict
+        
+        # Concurrent callers for the same creator all await one lookup instead of each querying
+        lookup = self._creator_lookups.get(creator_id)
+        if lookup is None:
+            lookup = asyncio.ensure_future(self.lookup_creator(creator_id, creator_name))
+            self._creator_lookups[creator_id] = lookup
+            lookup.add_done_callback(lambda _: self._creator_lookups.pop(creator_id, None))
+        
+        # Shielded so a cancelled caller does not abort the lookup others are waiting on
+        return await asyncio.shield(lookup)
+    
+    async def lookup_creator(self, creator_id: Union[int, str], creator_name: str) -> bool:
+        """Resolve a creator missing from both caches, from the database or else from SCMM"""
+        # The caches are bounded, so a miss may just be an evicted creator - the primary key probe
+        # is far cheaper than asking SCMM
+        if await self.is_creator_in_db(str(creator_id)):
+            self.known_creators[creator_id] = True
             return False
         
+        return await self.fetch_creator_verdict(creator_id, creator_name)
+    
+    async def is_creator_in_db(self, creator_id: str) -> bool:
+        """Check the creators table for a creator the in-memory cache no longer holds"""
+        return bool(await self._db_read(CREATOR_EXISTS_SQL, (creator_id,)))
+    
+    async def fetch_creator_verdict(self, creator_id: Union[int, str], creator_name: str) -> bool:
+        """Ask SCMM whether a creator has at most one accepted item"""
         try:
-            response = requests.get(f"{self.api_base}/profile/{creator_id}/summary", timeout=10)
+            # Only the total is inspected, so one row is enough; a creator without a profile yet has total 0
+            creator_items_response = await self.scmm_get(
+                "/item", 
+                params={
+                    'creatorId': creator_id,
+                    'count': 1,
+                    'start': 0
+                }
+            )
             
-            if response.status_code == 200:
-                creator_items_response = requests.get(
-                    f"{self.api_base}/item", 
-                    params={
-                        'creatorId': creator_id,
-                        'count': 100
-                    }, 
-                    timeout=10
-                )
+            if creator_items_response.status_code == 200:
+                creator_items = json_loads(creator_items_response.content)
+                total_items = creator_items.get('total', 0)
                 
-                if creator_items_response.status_code == 200:
-                    creator_items = creator_items_response.json()
-                    total_items = creator_items.get('total', 0)
-                    
-                    if total_items > 1:
-                        self.add_creator_to_db(creator_id_str, creator_name, total_items)
-                        logger.info(f"Creator {creator_name} has {total_items} items - not first-time")
-                        return False
-                    
-                    logger.info(f"Creator {creator_name} has {total_items} items - potentially first-time")
-                    return total_items <= 1
+                if total_items > 1:
+                    self.add_creator_to_db(creator_id, creator_name, total_items)
+                    logger.info(f"Creator {creator_name} has {total_items} items - not first-time")
+                    return False
                 
-                logger.info(f"Could not verify item count for {creator_name} - assuming first-time")
-                return True
-            
-            elif response.status_code == 404:
-                logger.info(f"Profile not found for {creator_name} (ID: {creator_id}) - likely first-time creator")
+                logger.info(f"Creator {creator_name} has {total_items} items - potentially first-time")
+                self.creator_verdicts[creator_id] = True
                 return True
             
             else:
-                logger.warning(f"Error {response.status_code} checking profile for {creator_name}")
+                logger.warning(f"Error {creator_items_response.status_code} checking items for {creator_name} - assuming first-time")
                 return True
             
         except Exception as e:
             logger.error(f"Error checking creator profile for {creator_id}: {e}")
             return True
     
-    def add_creator_to_db(self, creator_id: str, creator_name: str, skin_count: int = 1):
+    def add_creator_to_db(self, creator_id: Union[int, str], creator_name: str, skin_count: int = 1):
         """Add creator to global database"""
-        cursor = self.conn.cursor()
-        cursor.execute('''
-            INSERT OR REPLACE INTO creators 
-            (creator_id, creator_name, first_seen, skin_count) 
-            VALUES (?, ?, ?, ?)
-        ''', (creator_id, creator_name, datetime.now(), skin_count))
-        self.conn.commit()
-        self.known_creators.add(creator_id)
+        self._db_write(self.creator_row_statement(str(creator_id), creator_name, skin_count))
+        self.known_creators[creator_id] = True
+        self.creator_verdicts.pop(creator_id, None)
+    
+    def creator_row_statement(self, creator_id: str, creator_name: str, skin_count: int = 1) -> Tuple[str, Tuple]:
+        """Build the upsert for a creator row"""
+        return UPSERT_CREATOR_SQL, (creator_id, creator_name, skin_count)
+    
+    async def reset_user_progress(self, user_id: int):
+        """Zero the user's counter and forget their processed skins, returning once both are committed"""
+        session = self.get_user_session(user_id)
+        session.purchased_count = 0
+        session.processed_skins.clear()
+        session.feed_head = None
+        self.dirty_sessions.discard(user_id)
+        # Rows still buffered from this poll cycle would otherwise be flushed after the DELETE below
+        self.processed_buffer = [row for row in self.processed_buffer if row[0] != user_id]
+        
+        # Wait for the commit so the SQLite fallback in processed_skin_ids can't see the old rows
+        await asyncio.wrap_future(self._db_write(
+            self.session_columns_statement(user_id, purchased_count=0),
+            (DELETE_PROCESSED_SKINS_SQL, (user_id,))
+        ))
+    
+    def _db_write(self, *statements: Tuple[str, Tuple]) -> concurrent.futures.Future:
+        """Queue (sql, params) statements for the writer thread; they commit together"""
+        future = concurrent.futures.Future()
+        self.db_queue.put(([(sql, params, False) for sql, params in statements], future))
+        return future
+    
+    def _open_read_connection(self):
+        """Open the calling reader thread's connection"""
+        # Only ever used by the thread that opened it; the flag just lets shutdown close it
+        conn = sqlite3.connect(DB_PATH, check_same_thread=False, cached_statements=DB_CACHED_STATEMENTS)
+        conn.row_factory = sqlite3.Row
+        conn.executescript(SQLITE_PRAGMAS)
+        conn.execute("PRAGMA query_only=ON")
+        self._read_local.conn = conn
+        self._read_conns.append(conn)
+    
+    def _db_fetchall(self, sql: str, params: Tuple) -> List[sqlite3.Row]:
+        """Run a query on this reader thread's connection (reader threads only)"""
+        return self._read_local.conn.execute(sql, params).fetchall()
+    
+    async def _db_read(self, sql: str, params: Tuple = ()) -> List[sqlite3.Row]:
+        """Run a query on the reader pool and await its rows"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.db_reader, self._db_fetchall, sql, params)
+    
+    def flush_processed_skins(self):
+        """Write the processed rows buffered during a poll cycle as a single writer job"""
+        if not self.processed_buffer:
+            return
+        
+        rows = self.processed_buffer
+        self.processed_buffer = []
+        self._db_write(*_processed_skins_statements(rows))
+    
+    def flush_dirty_sessions(self):
+        """Persist purchased_count for every session changed since the last flush in one batch"""
+        if not self.dirty_sessions:
+            return
+        
+        rows = [
+            (self.user_sessions[user_id].purchased_count, user_id)
+            for user_id in self.dirty_sessions if user_id in self.user_sessions
+        ]
+        self.dirty_sessions.clear()
+        self._db_write_many(FLUSH_PURCHASED_COUNT_SQL, rows)
+    
+    async def _session_flush_loop(self):
+        """Periodically write back session counters updated in memory"""
+        while True:
+            await asyncio.sleep(SESSION_FLUSH_INTERVAL)
+            self.flush_dirty_sessions()
+    
+    def _db_write_many(self, sql: str, rows: List[Tuple]) -> concurrent.futures.Future:
+        """Queue an executemany for the writer thread"""
+        future = concurrent.futures.Future()
+        self.db_queue.put(([(sql, rows, True)], future))
+        return future
+    
+    def _db_writer_loop(self):
+        """Apply queued writes on a dedicated connection, one commit per collected batch"""
+        conn = sqlite3.connect(DB_PATH, isolation_level=None, cached_statements=DB_CACHED_STATEMENTS)
+        conn.executescript(SQLITE_PRAGMAS)
+        
+        # Bound once - these run for every statement the bot writes
+        execute = conn.execute
+        executemany = conn.executemany
+        get = self.db_queue.get
+        get_nowait = self.db_queue.get_nowait
+        
+        running = True
+        while running:
+            # Writes arriving in a burst share one commit: collect for a short window or up to a cap
+            jobs = [get()]
+            deadline = time.monotonic() + DB_WRITE_BATCH_WINDOW
+            while jobs[-1] is not None and len(jobs) < DB_WRITE_BATCH_MAX:
+                remaining = deadline - time.monotonic()
+                try:
+                    jobs.append(get(timeout=remaining) if remaining > 0 else get_nowait())
+                except queue.Empty:
+                    break
+            
+            # None is the shutdown sentinel; everything queued before it is still written
+            if None in jobs:
+                running = False
+                jobs = [job for job in jobs if job is not None]
+            if not jobs:
+                continue
+            
+            # RUNNING futures can no longer be cancelled, so resolving them below cannot raise. A job whose
+            # awaiter already gave up is still written, there is just no one left to tell
+            pending = [future for _, future in jobs if future.set_running_or_notify_cancel()]
+            failed = {}  # future -> error, for jobs that did not commit
+            try:
+                # Take the write lock up front so busy_timeout covers it, rather than upgrading mid-batch
+                execute("BEGIN IMMEDIATE")
+                for statements, future in jobs:
+                    # A failing job is rolled back on its own without losing the rest of the batch
+                    execute("SAVEPOINT job")
+                    try:
+                        for sql, params, many in statements:
+                            if many:
+                                executemany(sql, params)
+                            else:
+                                execute(sql, params)
+                    except sqlite3.Error as e:
+                        logger.error(f"Database write failed: {e}")
+                        execute("ROLLBACK TO job")
+                        failed[future] = e
+                    execute("RELEASE job")
+                execute("COMMIT")
+            except sqlite3.Error as e:
+                logger.error(f"Database commit failed, dropping {len(jobs)} writes: {e}")
+                if conn.in_transaction:
+                    with contextlib.suppress(sqlite3.Error):
+                        execute("ROLLBACK")
+                # Nothing in the batch was committed, including jobs the loop never reached
+                failed = {future: failed.get(future, e) for _, future in jobs}
+            
+            for future in pending:
+                if future in failed:
+                    future.set_exception(failed[future])
+                else:
+                    future.set_result(None)
+        
+        conn.close()
     
     async def send_user_message(self, user_id: int, message: str):
-        """Send message to a specific user"""
+        """Queue a message for delivery to a specific user"""
+        pending = self.tg_pending.get(user_id)
+        if pending is not None:
+            pending.append(message)
+            return
+        
+        # First message for this chat opens a batch window; later ones ride along
+        self.tg_pending[user_id] = [message]
+        self.tg_flush_handles[user_id] = asyncio.get_running_loop().call_later(
+            TG_BATCH_WINDOW, self._tg_schedule_flush, user_id
+        )
+    
+    def _tg_schedule_flush(self, user_id: int):
+        """Hand a chat whose batch window has closed to the sender pool"""
+        self.tg_flush_handles.pop(user_id, None)
+        self.tg_queue.put_nowait(user_id)
+    
+    def _tg_batch_messages(self, messages: List[str]) -> List[str]:
+        """Join messages into as few texts as fit within Telegram's length limit"""
+        batches = []
+        current = ""
+        for message in messages:
+            if current and len(current) + 2 + len(message) > TG_MAX_MESSAGE_LENGTH:
+                batches.append(current)
+                current = message
+            else:
+                current = f"{current}\n\n{message}" if current else message
+        if current:
+            batches.append(current)
+        return batches
+    
+    async def _tg_chat_slot(self, user_id: int):
+        """Wait for this chat's next send slot so oversized batches are not sent back-to-back"""
+        now = time.monotonic()
+        slot = max(now, self.tg_next_send.get(user_id, 0.0))
+        # Reserved before sleeping so another worker holding the same chat queues behind it
+        self.tg_next_send[user_id] = slot + TG_CHAT_MIN_INTERVAL
+        if slot > now:
+            await asyncio.sleep(slot - now)
+    
+    async def _tg_worker(self):
+        """Deliver batched messages while respecting Telegram's global rate limit"""
+        while True:
+            user_id = await self.tg_queue.get()
+            try:
+                # Each joined message is sent on its own, so one failure never drops the rest of the chat's batch
+                for text in self._tg_batch_messages(self.tg_pending.pop(user_id, [])):
+                    await self._tg_send(user_id, text)
+            finally:
+                self.tg_queue.task_done()
+    
+    async def _tg_send(self, user_id: int, text: str):
+        """Send one message, waiting out Telegram flood control; other failures are logged and dropped"""
+        for attempt in range(TG_SEND_RETRIES + 1):
+            try:
+                await self._tg_chat_slot(user_id)
+                await self.tg_rate_limiter.acquire()
+                await self.application.bot.send_message(
+                    chat_id=user_id,
+                    text=text,
+                    parse_mode='MarkdownV2'
+                )
+                return
+            except RetryAfter as e:
+                if attempt == TG_SEND_RETRIES:
+                    logger.error(f"Giving up on message to user {user_id} after {attempt + 1} flood-control waits")
+                    return
+                logger.warning(f"Telegram flood control for user {user_id}, retrying in {e.retry_after}s")
+                await asyncio.sleep(e.retry_after)
+            except Exception as e:
+                logger.error(f"Error sending message to user {user_id}: {e}")
+                return
+    
+    async def post_init(self, application: Application):
+        """Start background workers once the event loop is running"""
+        limits = httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY
+        )
+        self.http = httpx.AsyncClient(
+            base_url=self.api_base,
+            headers=SCMM_HEADERS,
+            timeout=SCMM_TIMEOUT,
+            transport=httpx.AsyncHTTPTransport(limits=limits, retries=HTTP_CONNECT_RETRIES)
+        )
+        
+        self.tg_workers = [
+            asyncio.create_task(self._tg_worker()) for _ in range(TG_SEND_WORKERS)
+        ]
+        self.session_flush_task = asyncio.create_task(self._session_flush_loop())
+        
+        self.resume_monitoring()
+    
+    async def post_stop(self, application: Application):
+        """Flush pending messages and session counters, then stop background workers"""
+        if self.poller_task is not None:
+            self.poller_task.cancel()
+            await asyncio.gather(self.poller_task, return_exceptions=True)
+            self.poller_task = None
+        
+        if self.session_flush_task is not None:
+            self.session_flush_task.cancel()
+            self.session_flush_task = None
+        self.flush_dirty_sessions()
+        self.flush_processed_skins()
+        
+        # Close any open batch windows early so nothing is left behind
+        for user_id, handle in list(self.tg_flush_handles.items()):
+            handle.cancel()
+            self._tg_schedule_flush(user_id)
+        
         try:
-            await self.application.bot.send_message(
-                chat_id=user_id,
-                text=message,
-                parse_mode='Markdown'
-            )
-        except Exception as e:
-            logger.error(f"Error sending message to user {user_id}: {e}")
+            await asyncio.wait_for(self.tg_queue.join(), timeout=10)
+        except asyncio.TimeoutError:
+            logger.warning(f"Dropping {self.tg_queue.qsize()} undelivered messages on shutdown")
+        
+        for worker in self.tg_workers:
+            worker.cancel()
+        await asyncio.gather(*self.tg_workers, return_exceptions=True)
+        self.tg_workers = []
+    
+    async def post_shutdown(self, application: Application):
+        """Release network resources, flush queued writes and refresh query planner statistics"""
+        if self.http is not None:
+            await self.http.aclose()
+            self.http = None
+        
+        # Runs on the writer thread as its last job, so shutdown never blocks the event loop on it
+        self._db_write(("PRAGMA optimize", ()))
+        self.db_queue.put(None)
+        await asyncio.to_thread(self.db_writer.join)
+        
+        await asyncio.to_thread(self.db_reader.shutdown)
+        for conn in self._read_conns:
+            conn.close()
+        self._read_conns.clear()
     
     def run(self):
         """Start the bot with conflict handling"""
@@ -1339,47 +2215,11 @@ Send me the maximum price you want to spend per item (in USD).
         user_id = query.from_user.id
         session = self.get_user_session(user_id)
         
-        new_test_mode = not session.get('test_mode', False)
+        new_test_mode = not session.test_mode
         self.update_user_session(user_id, test_mode=new_test_mode)
         
-        if new_test_mode:
-            text = """🧪 *Test Mode Enabled!*
-
-**What Test Mode Does:**
-• Scans SCMM for first-time creator items (expanded to 7 days!)
-• Shows you detailed info about what it finds
-• Reports item age, creator details, prices
-• **SIMULATES purchases** with fake success/failure results
-• Perfect for testing the bot logic without spending money
-
-**You'll see reports like:**
-✅ Found first-time creator: "ArtistName"
-📅 Item age: 2 days old (within 7 day limit)
-💰 Price: $5.50 (within your $10 budget)
-🧪 **SIMULATED SUCCESSFUL PURCHASE** (fake)
-🎯 This WOULD be a real purchase in live mode
-
-**Use ▶️ Start Monitoring to begin test scanning!**"""
-        else:
-            text = """💰 *Live Mode Enabled!*
-
-**What Live Mode Does:**
-• Scans SCMM for first-time creator items  
-• **ACTUALLY PURCHASES** qualifying items
-• Requires Steam session token
-• Uses Selenium for human-like purchasing
-
-**Make sure you:**
-✅ Set your Steam session token
-✅ Fund your Steam wallet
-✅ Configure your max price
-
-**Ready for real purchases!**"""
-        
-        keyboard = [[InlineKeyboardButton("🔙 Back to Main", callback_data="back_main")]]
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        
-        await query.edit_message_text(text, parse_mode='Markdown', reply_markup=reply_markup)
+        text = TEST_MODE_ENABLED_TEXT if new_test_mode else LIVE_MODE_ENABLED_TEXT
+        await query.edit_message_text(text, parse_mode='Markdown', reply_markup=self.back_main_markup)
     
     async def show_main_menu_inline(self, query):
         """Show main menu inline"""
@@ -1387,63 +2227,12 @@ Send me the maximum price you want to spend per item (in USD).
         username = query.from_user.username or query.from_user.first_name
         session = self.get_user_session(user_id, username)
         
-        keyboard = [
-            [InlineKeyboardButton("📊 My Status", callback_data="status"),
-             InlineKeyboardButton("🛍️ My Purchases", callback_data="purchases")],
-            [InlineKeyboardButton("🔑 Set Steam Token", callback_data="settoken"),
-             InlineKeyboardButton("⚙️ Settings", callback_data="settings")],
-            [InlineKeyboardButton("▶️ Start Monitoring", callback_data="startbot"),
-             InlineKeyboardButton("⏹️ Stop Monitoring", callback_data="stopbot")],
-            [InlineKeyboardButton("🧪 Test Mode", callback_data="test_mode"),
-             InlineKeyboardButton("❓ Help", callback_data="help")]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        
-        status_emoji = "🟢" if session['is_monitoring'] else "🔴"
-        token_emoji = "✅" if session['steam_session_token'] else "❌"
-        test_emoji = "🧪" if session.get('test_mode', False) else "💰"
-        
-        # Prepare text parts to avoid backslashes in f-strings
-        monitoring_status = 'Active' if session['is_monitoring'] else 'Stopped'
-        token_status = 'Configured' if session['steam_session_token'] else 'Not Set'
-        auto_purchase_status = '✅ Enabled' if session.get('auto_purchase', True) else '❌ Disabled'
-        mode_status = '🧪 Test Mode (No Purchases)' if session.get('test_mode', False) else '💰 Live Mode'
-        max_price = session.get('max_price_cents', 1000) / 100
-        
-        test_mode = session.get('test_mode', False)
-        action_description = 'Show you opportunities without purchasing (TEST MODE)' if test_mode else 'Automatically purchase items within your price limit'
-        notification_type = 'findings' if test_mode else 'purchases/opportunities'
-        
-        quick_start_1 = 'Enable 🧪 Test Mode to scan without purchasing' if not test_mode else "You're in test mode - perfect for testing!"
-        quick_start_3 = "I'll show you what I find without buying anything!" if test_mode else 'Set your Steam token and configure auto-purchase'
-        
-        welcome_text = f"""🤖 *Welcome to Rust Skin Auto-Purchase Bot!*
-
-👋 Hello {username}! I find AND buy new skins from first-time creators automatically!
-
-📊 **Your Status:**
-{status_emoji} **Monitoring**: {monitoring_status}
-{token_emoji} **Steam Token**: {token_status}
-🤖 **Auto Purchase**: {auto_purchase_status}
-{test_emoji} **Mode**: {mode_status}
-💰 **Max Price**: ${max_price:.2f}
-🎯 **Progress**: {session['purchased_count']}/{session['max_purchases']} items
-
-🎨 **What I Do:**
-• Monitor SCMM for new items from first-time creators
-• Only consider items that are 7 days old or newer
-• {action_description}
-• Send instant notifications of {notification_type}
-• Track progress and stop after 10 successful actions
-
-**🚀 Quick Start:**
-1️⃣ {quick_start_1}
-2️⃣ Start monitoring with ▶️ Start Monitoring
-3️⃣ {quick_start_3}
-
-Use the buttons below or type /help for more info."""
+        welcome_text = _render_welcome(
+            username, session.is_monitoring, bool(session.steam_session_token), session.auto_purchase,
+            session.max_price_cents, session.test_mode, session.purchased_count, session.max_purchases
+        )
 
-        await query.edit_message_text(welcome_text, parse_mode='Markdown', reply_markup=reply_markup)
+        await query.edit_message_text(welcome_text, parse_mode='Markdown', reply_markup=self.main_menu_markup)
 
 if __name__ == "__main__":
     if not os.getenv('TELEGRAM_BOT_TOKEN'):
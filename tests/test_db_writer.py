@@ -0,0 +1,59 @@
+"""Writer-thread behaviour around cancelled awaiters and batches that fail to commit"""
+
+import asyncio
+import concurrent.futures
+import os
+import sys
+import tempfile
+import unittest
+
+os.environ.setdefault('TELEGRAM_BOT_TOKEN', '123456:ABCDEF')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bot
+
+
+class DbWriterTest(unittest.TestCase):
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.tmp = tempfile.TemporaryDirectory()
+        os.chdir(self.tmp.name)  # DB_PATH is relative
+        self.bot = bot.RustSkinTelegramBot()
+    
+    def tearDown(self):
+        asyncio.run(self.bot.post_shutdown(None))
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+    
+    def creator_count(self):
+        return self.bot.conn.execute("SELECT COUNT(*) FROM creators").fetchone()[0]
+    
+    def test_cancelled_awaiter_does_not_kill_writer(self):
+        cancelled = concurrent.futures.Future()
+        cancelled.cancel()
+        self.bot.db_queue.put(([(bot.UPSERT_CREATOR_SQL, ('1', 'a', 1), False)], cancelled))
+        
+        # A later write still commits, so the thread survived resolving the batch
+        self.bot._db_write((bot.UPSERT_CREATOR_SQL, ('2', 'b', 1))).result(timeout=5)
+        self.assertTrue(self.bot.db_writer.is_alive())
+        # The cancelled job's write is applied even though nobody is waiting for it
+        self.assertEqual(self.creator_count(), 2)
+    
+    def test_failed_batch_fails_every_job(self):
+        # Ending the transaction from inside a job makes the writer's own RELEASE fail, aborting the
+        # batch before the jobs queued after it are reached
+        before = self.bot._db_write((bot.UPSERT_CREATOR_SQL, ('1', 'a', 1)))
+        breaker = self.bot._db_write(("COMMIT", ()))
+        after = self.bot._db_write((bot.UPSERT_CREATOR_SQL, ('2', 'b', 1)))
+        
+        for future in (breaker, after):
+            with self.assertRaises(bot.sqlite3.Error):
+                future.result(timeout=5)
+        before.exception(timeout=5)  # resolved one way or the other, never left pending
+        
+        self.bot._db_write((bot.UPSERT_CREATOR_SQL, ('3', 'c', 1))).result(timeout=5)
+        self.assertTrue(self.bot.db_writer.is_alive())
+
+
+if __name__ == '__main__':
+    unittest.main()